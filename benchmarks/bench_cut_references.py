@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Per-document cost of cutting the reference section.
+
+Run with ``python benchmarks/bench_cut_references.py``. The "rebuilt" column
+empties the shared pattern caches of ``invenio_classifier.find`` before every
+document, which is what each call used to cost; "cold" also empties the
+cache of the ``re`` module, as happens once the few thousand taxonomy
+patterns have been compiled in a worker.
+"""
+
+from __future__ import print_function
+
+import re
+
+from documents import best_of, make_document
+
+from invenio_classifier import find
+from invenio_classifier.normalizer import cut_references
+
+
+def _clear_pattern_caches():
+    find._reference_patterns.clear()
+    find._title_marker_patterns.clear()
+
+
+def main():
+    """Print the time spent in cut_references per document."""
+    print("%-22s %10s %10s %10s" % ("document", "cold", "rebuilt", "cached"))
+    for name, document in (
+        ("abstract", make_document(20, references=0)),
+        ("article, 2k lines", make_document(2000)),
+        ("article + appendix", make_document(2000, appendix_lines=500)),
+        ("thesis, 40k lines", make_document(40000, references=400)),
+    ):
+
+        def cold():
+            re.purge()
+            _clear_pattern_caches()
+            cut_references(list(document))
+
+        def rebuilt():
+            _clear_pattern_caches()
+            cut_references(list(document))
+
+        def cached():
+            cut_references(list(document))
+
+        print(
+            "%-22s %8.2fms %8.2fms %8.2fms"
+            % (
+                name,
+                best_of(cold) * 1000,
+                best_of(rebuilt) * 1000,
+                best_of(cached) * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
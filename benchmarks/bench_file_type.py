@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Per-file cost of recognising the type of a file.
+
+Run with ``python benchmarks/bench_file_type.py``. The "sniffed" column reads
+the first kilobyte of the file with ``get_file_type``; the "file" column runs
+the file executable on it, as ``get_plaintext_document_body`` used to.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+from documents import best_of, make_document
+
+from invenio_classifier.config import CLASSIFIER_PATH_GFILE
+from invenio_classifier.extractor import get_file_type
+
+PDF = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "1603.08749.pdf")
+
+
+def main():
+    """Print the time spent recognising the type of a file."""
+    directory = tempfile.mkdtemp()
+    try:
+        text = os.path.join(directory, "article.txt")
+        with open(text, "w") as filestream:
+            filestream.write("\n".join(make_document(2000)))
+
+        print("%-10s %10s %10s" % ("file", "sniffed", "file"))
+        for name, path in (("pdf", PDF), ("text", text)):
+
+            def sniffed():
+                get_file_type(path)
+
+            def gfile():
+                subprocess.Popen(
+                    [CLASSIFIER_PATH_GFILE, "-b", path], stdout=subprocess.PIPE
+                ).communicate()
+
+            print(
+                "%-10s %8.3fms %8.3fms"
+                % (
+                    name,
+                    best_of(sniffed, number=100) * 1000,
+                    best_of(gfile, number=20) * 1000 if CLASSIFIER_PATH_GFILE else 0,
+                )
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
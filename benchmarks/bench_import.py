@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Time spent importing ``invenio_classifier`` in a new interpreter.
+
+Run with ``python benchmarks/bench_import.py``. Every run starts a fresh
+``python -X importtime`` (Python 3.7 or later), and the slowest modules of
+the fastest run are listed with their own and their cumulative import time.
+``tests/test_import.py`` enforces a budget on the total.
+"""
+
+from __future__ import print_function
+
+import subprocess
+import sys
+
+
+def import_times(module="invenio_classifier"):
+    """Return the own and cumulative import times of every imported module."""
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        if own.strip().isdigit():
+            times[name.strip()] = (int(own) / 1e6, int(cumulative) / 1e6)
+    return times
+
+
+def main(runs=5, top=15):
+    """Print the import time of the package and of its slowest modules."""
+    times = min(
+        (import_times() for _ in range(runs)),
+        key=lambda times: times["invenio_classifier"][1],
+    )
+    print("%-45s %10s %10s" % ("module", "self", "cumulative"))
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (own, cumulative) in slowest[:top]:
+        print("%-45s %8.2fms %8.2fms" % (name, own * 1000, cumulative * 1000))
+    print("%-45s %10s %8.2fms" % ("total", "", times["invenio_classifier"][1] * 1000))
+    print(
+        "rdflib imported: %s, requests imported: %s"
+        % ("rdflib" in times, "requests" in times)
+    )
+
+
+if __name__ == "__main__":
+    main()
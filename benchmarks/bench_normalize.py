@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+
+"""Time and peak memory of normalizing the fulltext of a document.
+
+Run with ``python benchmarks/bench_normalize.py [lines]`` (Python 3). The
+"fulltext" row joins the lines and normalizes them with
+``normalize_fulltext``, as ``get_keywords_from_text`` used to, and the
+"stream" row joins the chunks of ``normalize_stream``, as it does now. The
+keywords are matched on the whole normalized text, which both rows hold at
+the end: the stream only saves the intermediate copies of the whole text
+that every washing pass of ``normalize_fulltext`` makes, not the text
+itself.
+"""
+
+from __future__ import print_function
+
+import logging
+import sys
+import time
+import tracemalloc
+
+from documents import make_document
+
+from invenio_classifier.document import DocumentBuffer
+from invenio_classifier.normalizer import normalize_fulltext, normalize_stream
+
+
+def measure(function):
+    """Return the time and the peak memory of a call to function.
+
+    The memory is traced in a second call, as tracing slows it down.
+    """
+    start = time.time()
+    function()
+    elapsed = time.time() - start
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(lines=50000):
+    """Print the time and peak memory of the ways of normalizing a text."""
+    # Every chunk without a replacement is logged.
+    logging.getLogger("invenio_classifier").setLevel(logging.ERROR)
+    document = DocumentBuffer.from_lines(make_document(lines))
+
+    def fulltext():
+        normalize_fulltext("\n".join(document))
+
+    def stream():
+        "".join(normalize_stream(document))
+
+    print(
+        "%d lines, %.1fMB of text"
+        % (len(document), len(document.text) / float(1 << 20))
+    )
+    print("%-20s %10s %12s" % ("normalizer", "time", "peak"))
+    for name, function in (("fulltext", fulltext), ("stream", stream)):
+        elapsed, peak = measure(function)
+        print("%-20s %9.2fs %10.1fMB" % (name, elapsed, peak / float(1 << 20)))
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:]))
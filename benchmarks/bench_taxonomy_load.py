@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Time spent loading the cache of a large taxonomy.
+
+Run with ``python benchmarks/bench_taxonomy_load.py [singles] [composites]``.
+A SKOS taxonomy of the size of the HEP one is written and its cache built
+once. The "pickle" row loads the keywords pickled with protocol 1 and
+resolves the components of the composite keywords, as caches used to be
+loaded; the "marshal" row loads the cache as it is written now, and the
+"unmarshal" row only reads it, without making the keywords. The regexes of
+the keywords are compiled when first used, which the "compile" row adds to
+the "marshal" one.
+"""
+
+from __future__ import print_function
+
+import marshal
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+
+from documents import WORDS, best_of
+from six.moves import cPickle
+
+from invenio_classifier import reader
+
+HEADER = """<?xml version="1.0" encoding="UTF-8" ?>
+<rdf:RDF xmlns="http://www.w3.org/2004/02/skos/core#"
+    xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+"""
+NAMESPACE = "http://cern.ch/thesauri/HEPontology.rdf#"
+
+
+def write_taxonomy(path, singles, composites, seed=0):
+    """Write a SKOS taxonomy of single and composite keywords."""
+    rand = random.Random(seed)
+    labels = []
+    with open(path, "w") as filestream:
+        filestream.write(HEADER)
+        for number in range(singles):
+            label = "%s %s%d" % (rand.choice(WORDS), rand.choice(WORDS), number)
+            labels.append(label.replace(" ", ""))
+            filestream.write(
+                '<Concept rdf:about="%s%s">\n'
+                '  <prefLabel xml:lang="en">%s</prefLabel>\n'
+                '  <altLabel xml:lang="en">%s</altLabel>\n'
+                "</Concept>\n" % (NAMESPACE, labels[-1], label, label.upper())
+            )
+        for _ in range(composites):
+            first, second = rand.sample(labels, 2)
+            filestream.write(
+                '<Concept rdf:about="%sComposite.%s%s">\n'
+                '  <prefLabel xml:lang="en">%s: %s</prefLabel>\n'
+                '  <compositeOf rdf:resource="%s%s"/>\n'
+                '  <compositeOf rdf:resource="%s%s"/>\n'
+                "</Concept>\n"
+                % (
+                    (NAMESPACE, first, second, first, second)
+                    + (NAMESPACE, first, NAMESPACE, second)
+                )
+            )
+        filestream.write("</rdf:RDF>\n")
+
+
+def main(singles=3000, composites=12000):
+    """Print the time spent loading a taxonomy cache."""
+    directory = tempfile.mkdtemp()
+    try:
+        reader.CACHE_PATH = directory
+        taxonomy = os.path.join(directory, "taxonomy.rdf")
+        write_taxonomy(taxonomy, singles, composites)
+        single_keywords, composite_keywords = reader._build_cache(taxonomy)
+        cache = reader._get_cache_path(taxonomy)
+
+        # The previous format: keywords pickled before their components
+        # were resolved, by short ids.
+        for kw in composite_keywords.values():
+            kw.compositeof = [component.short_id for component in kw.compositeof]
+        pickled = os.path.join(directory, "taxonomy.pickle")
+        with open(pickled, "wb") as filestream:
+            cPickle.dump(
+                {"single": single_keywords, "composite": composite_keywords},
+                filestream,
+                1,
+            )
+
+        def pickle_load():
+            with open(pickled, "rb") as filestream:
+                data = cPickle.load(filestream)
+            for kw in data["composite"].values():
+                kw.refreshCompositeOf(data["single"], data["composite"])
+
+        def marshal_load():
+            reader._get_cache(cache, taxonomy)
+
+        def marshal_compile():
+            for keywords in reader._get_cache(cache, taxonomy):
+                for kw in keywords.values():
+                    kw.regex
+
+        def marshal_read():
+            with open(cache, "rb") as filestream:
+                marshal.loads(filestream.read())
+
+        print("%d single and %d composite keywords" % (singles, composites))
+        print("%-10s %10s %10s" % ("format", "size", "load"))
+        for name, path, function in (
+            ("pickle", pickled, pickle_load),
+            ("marshal", cache, marshal_load),
+            ("unmarshal", cache, marshal_read),
+            ("compile", cache, marshal_compile),
+        ):
+            re.purge()
+            print(
+                "%-10s %8.1fMB %8.1fms"
+                % (
+                    name,
+                    os.path.getsize(path) / float(1 << 20),
+                    best_of(function, number=1) * 1000,
+                )
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:]))
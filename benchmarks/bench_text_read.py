@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Time and peak memory of reading a large text file.
+
+Run with ``python benchmarks/bench_text_read.py [megabytes]`` (Python 3).
+The "codecs" and "read" rows read the file as ``document_from_local_file``
+and ``get_plaintext_document_body`` used to, the other rows read it with
+the memory-mapped ``iter_text_file_lines``.
+"""
+
+from __future__ import print_function
+
+import codecs
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from documents import make_document
+
+from invenio_classifier.document import DocumentBuffer
+from invenio_classifier.extractor import _with_one_word, iter_text_file_lines
+
+
+def measure(function):
+    """Return the time and the peak memory of a call to function.
+
+    The memory is traced in a second call, as tracing slows it down.
+    """
+    start = time.time()
+    function()
+    elapsed = time.time() - start
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(megabytes=100):
+    """Print the time and peak memory of the ways of reading a text file."""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "dump.txt")
+        chunk = "\n".join(make_document(2000, appendix_lines=2000)) + "\n"
+        with io.open(path, "w", encoding="utf-8") as filestream:
+            for _ in range(megabytes * (1 << 20) // len(chunk) + 1):
+                filestream.write(chunk)
+
+        def codecs_document():
+            with codecs.open(path, "r", encoding="utf8", errors="replace") as stream:
+                DocumentBuffer.from_lines(_with_one_word(stream))
+
+        def mapped_document():
+            DocumentBuffer.from_lines(
+                _with_one_word(iter_text_file_lines(path, errors="replace"))
+            )
+
+        def read_body():
+            with open(path, "rb") as stream:
+                io.StringIO(stream.read().decode("utf-8")).readlines()
+
+        def mapped_body():
+            list(iter_text_file_lines(path, universal_newlines=False))
+
+        print("%d MB text file" % (os.path.getsize(path) >> 20))
+        print("%-20s %10s %12s" % ("reader", "time", "peak"))
+        for name, function in (
+            ("codecs document", codecs_document),
+            ("mapped document", mapped_document),
+            ("read body", read_body),
+            ("mapped body", mapped_body),
+        ):
+            elapsed, peak = measure(function)
+            print("%-20s %9.2fs %10.1fMB" % (name, elapsed, peak / float(1 << 20)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:]))
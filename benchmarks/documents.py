@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Synthetic documents shared by the benchmarks."""
+
+from __future__ import print_function, unicode_literals
+
+import random
+import timeit
+
+WORDS = (
+    "the of a gauge field theory Yang-Mills supersymmetry quark gluon "
+    "lattice boson decay we show that in this paper model mass energy"
+).split()
+
+
+def make_document(body_lines=2000, references=60, appendix_lines=0, seed=0):
+    """Return a list of text lines looking like a pdftotext conversion."""
+    rand = random.Random(seed)
+    lines = []
+    for index in range(body_lines):
+        if index and index % 50 == 0:
+            lines.append("\f")
+        lines.append(" ".join(rand.choice(WORDS) for _ in range(12)))
+    if references:
+        lines.append("References")
+        for number in range(1, references + 1):
+            lines.append(
+                "[%d] A. Author and B. Author, Phys. Rev. D %d (%d) %d."
+                % (number, rand.randint(1, 99), rand.randint(1980, 2020), number)
+            )
+            lines.append("   " + " ".join(rand.choice(WORDS) for _ in range(6)))
+    if appendix_lines:
+        lines.append("Appendix A: Conventions")
+        for _ in range(appendix_lines):
+            lines.append(" ".join(rand.choice(WORDS) for _ in range(12)))
+    return lines
+
+
+def best_of(function, number=5, repeat=3):
+    """Return the best time of one call to function, in seconds."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
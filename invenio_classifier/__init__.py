@@ -30,11 +30,18 @@ or access the API directly.
 
 from __future__ import absolute_import, print_function
 
-from .api import get_keywords_from_text, get_keywords_from_local_file
+from .api import (
+    get_keywords_from_bytes,
+    get_keywords_from_local_file,
+    get_keywords_from_stream,
+    get_keywords_from_text,
+)
 from .version import __version__
 
 __all__ = (
     "__version__",
     "get_keywords_from_text",
     "get_keywords_from_local_file",
+    "get_keywords_from_bytes",
+    "get_keywords_from_stream",
 )
@@ -21,6 +21,8 @@
 
 from __future__ import print_function
 
+import io
+import itertools
 import os
 import re
 
@@ -39,9 +41,20 @@ from .engine import (
     get_keywords_output,
     get_partial_text,
 )
-from .extractor import get_plaintext_document_body, text_lines_from_local_file
-from .normalizer import cut_references, normalize_fulltext
+from .document import DocumentBuffer
+from .errors import ConversionError
+from .extractor import (
+    document_from_local_file,
+    document_from_stream,
+    get_archive_type,
+    get_plaintext_document_body,
+    iter_archive_documents,
+    partial_document_from_local_file,
+)
+from .normalizer import cut_references, normalize_stream
+from .fetcher import default_fetcher
 from .reader import get_cache, get_regular_expressions, set_cache
+from .utils import prefetch
 
 logger = logging.getLogger(__name__)
 
@@ -59,14 +72,20 @@ def output_keywords_for_sources(
     only_core_tags=False,
     extract_acronyms=False,
 ):
-    """Output the keywords for each source in sources."""
+    """Output the keywords for each source in sources.
+
+    Sources are directories, files and URLs. The PDF and text files of tar
+    and zip archives are read without unpacking them, and consecutive URLs
+    are fetched concurrently. Files which are neither PDF, text nor archive
+    files are skipped, and so are documents whose conversion failed.
+    """
     if output_limit is None:
         output_limit = CLASSIFIER_DEFAULT_OUTPUT_NUMBER
 
     # Inner function which does the job and it would be too much work to
     # refactor the call (and it must be outside the loop, before it did
     # not process multiple files)
-    def process_lines():
+    def process_lines(source, text_lines):
         if output_mode == "text":
             print("Input file: %s" % source)
 
@@ -90,35 +109,45 @@ def output_keywords_for_sources(
             extract_acronyms=extract_acronyms,
         )
 
+    def process_file(filename, source):
+        if get_archive_type(filename):
+            # The next member is converted while a member is processed.
+            for member, text_lines in prefetch(iter_archive_documents(filename)):
+                if text_lines:
+                    process_lines("%s:%s" % (source, member), text_lines)
+            return
+        try:
+            text_lines, dummy = get_plaintext_document_body(filename)
+        except ConversionError as error:
+            logger.error("Unable to convert %s. (%s)" % (filename, error))
+            return
+        if text_lines:
+            process_lines(source, text_lines)
+
+    def is_url(entry):
+        return not os.path.isdir(entry) and not os.path.isfile(entry)
+
     # Get the fulltext for each source.
-    for entry in input_sources:
-        logger.info("Trying to read input file %s." % entry)
-        text_lines = None
-        source = ""
-        if os.path.isdir(entry):
-            for filename in os.listdir(entry):
-                if filename.startswith("."):
-                    continue
-                filename = os.path.join(entry, filename)
-                if os.path.isfile(filename):
-                    text_lines, dummy = get_plaintext_document_body(filename)
-                    if text_lines:
-                        source = filename
-                        process_lines()
-        elif os.path.isfile(entry):
-            text_lines, dummy = get_plaintext_document_body(entry)
-            if text_lines:
-                source = os.path.basename(entry)
-                process_lines()
-        else:
-            # Treat as a URL.
-            from invenio_utils.filedownload import download_url
-
-            local_file = download_url(entry)
-            text_lines, dummy = get_plaintext_document_body(local_file)
-            if text_lines:
-                source = entry.split("/")[-1]
-                process_lines()
+    for urls, entries in itertools.groupby(input_sources, is_url):
+        if urls:
+            for url, member, text_lines in default_fetcher.fetch_all(entries):
+                source = url.split("/")[-1]
+                if member is not None:
+                    source = "%s:%s" % (source, member)
+                if text_lines:
+                    process_lines(source, text_lines)
+            continue
+        for entry in entries:
+            logger.info("Trying to read input file %s." % entry)
+            if os.path.isdir(entry):
+                for filename in os.listdir(entry):
+                    if filename.startswith("."):
+                        continue
+                    filename = os.path.join(entry, filename)
+                    if os.path.isfile(filename):
+                        process_file(filename, filename)
+            else:
+                process_file(entry, os.path.basename(entry))
 
 
 def get_keywords_from_local_file(
@@ -142,7 +171,85 @@ def get_keywords_from_local_file(
         output_limit = CLASSIFIER_DEFAULT_OUTPUT_NUMBER
 
     logger.info("Analyzing keywords for local file %s." % local_file)
-    text_lines = text_lines_from_local_file(local_file)
+    text_lines = None
+    if match_mode == "partial":
+        # Only the pages of the partial text of PDF files are converted.
+        text_lines = partial_document_from_local_file(local_file)
+        if text_lines is not None:
+            match_mode = "full"
+    if text_lines is None:
+        text_lines = document_from_local_file(local_file)
+
+    return get_keywords_from_text(
+        text_lines,
+        taxonomy_name,
+        output_mode=output_mode,
+        output_limit=output_limit,
+        spires=spires,
+        match_mode=match_mode,
+        no_cache=no_cache,
+        with_author_keywords=with_author_keywords,
+        rebuild_cache=rebuild_cache,
+        only_core_tags=only_core_tags,
+        extract_acronyms=extract_acronyms,
+    )
+
+
+def get_keywords_from_bytes(
+    data,
+    taxonomy_name,
+    output_mode="text",
+    output_limit=None,
+    spires=False,
+    match_mode="full",
+    no_cache=False,
+    with_author_keywords=False,
+    rebuild_cache=False,
+    only_core_tags=False,
+    extract_acronyms=False,
+):
+    """Output keywords reading the content of a PDF or text file.
+
+    Arguments and output are the same as for :see: get_keywords_from_text().
+    """
+    return get_keywords_from_stream(
+        io.BytesIO(data),
+        taxonomy_name,
+        output_mode=output_mode,
+        output_limit=output_limit,
+        spires=spires,
+        match_mode=match_mode,
+        no_cache=no_cache,
+        with_author_keywords=with_author_keywords,
+        rebuild_cache=rebuild_cache,
+        only_core_tags=only_core_tags,
+        extract_acronyms=extract_acronyms,
+    )
+
+
+def get_keywords_from_stream(
+    stream,
+    taxonomy_name,
+    output_mode="text",
+    output_limit=None,
+    spires=False,
+    match_mode="full",
+    no_cache=False,
+    with_author_keywords=False,
+    rebuild_cache=False,
+    only_core_tags=False,
+    extract_acronyms=False,
+):
+    """Output keywords reading a PDF or text file object.
+
+    PDF files are piped into pdftotext, so no temporary file is written.
+    Arguments and output are the same as for :see: get_keywords_from_text().
+    """
+    if output_limit is None:
+        output_limit = CLASSIFIER_DEFAULT_OUTPUT_NUMBER
+
+    logger.info("Analyzing keywords for a stream.")
+    text_lines = document_from_stream(stream)
 
     return get_keywords_from_text(
         text_lines,
@@ -174,8 +281,8 @@ def get_keywords_from_text(
 ):
     """Extract keywords from the list of strings.
 
-    :param text_lines: list of strings (will be normalized before being
-        joined into one string)
+    :param text_lines: list of strings, or a `DocumentBuffer` (will be
+        normalized before being joined into one string)
     :param taxonomy_name: string, name of the taxonomy_name
     :param output_mode: string - text|html|marcxml|raw
     :param output_limit: int
@@ -204,8 +311,12 @@ def get_keywords_from_text(
         cache = get_cache(taxonomy_name)
     _skw = cache[0]
     _ckw = cache[1]
+    if not isinstance(text_lines, DocumentBuffer):
+        text_lines = DocumentBuffer.from_lines(text_lines)
     text_lines = cut_references(text_lines)
-    fulltext = normalize_fulltext("\n".join(text_lines))
+    # The keywords are matched on the whole text: the stream only saves the
+    # intermediate copies of the washing passes.
+    fulltext = "".join(normalize_stream(text_lines))
 
     if match_mode == "partial":
         fulltext = get_partial_text(fulltext)
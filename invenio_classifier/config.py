@@ -37,9 +37,68 @@ CLASSIFIER_WORKDIR = None
 CLASSIFIER_PATH_GFILE = which("file")
 """Path to file executable."""
 
+CLASSIFIER_GFILE_FALLBACK = False
+"""Ask the file executable for the type of the files that are recognised
+neither as PDF, PostScript or gzip, nor as text, instead of rejecting them."""
+
 CLASSIFIER_PATH_PDFTOTEXT = which("pdftotext")
 """Path to pdf2text executable."""
 
+CLASSIFIER_PATH_PDFINFO = which("pdfinfo")
+"""Path to pdfinfo executable, used to count the pages of PDF files."""
+
+CLASSIFIER_PDFTOTEXT_PAGES_PER_JOB = None
+"""Number of pages converted by each pdftotext process when PDF files are
+converted in page ranges run concurrently, or None to convert each file
+with a single process."""
+
+CLASSIFIER_BAD_CONVERSION_SAMPLE = 20000
+"""Number of words and whitespaces a pdftotext conversion writes before it
+can be killed for being clearly bad, as judged by
+``pdftotext_conversion_is_bad``, or None to always convert to the end."""
+
+CLASSIFIER_PDFTOTEXT_CONCURRENCY = 4
+"""Largest number of pdftotext conversions a process runs at the same time.
+Further conversions wait for one of them to finish."""
+
+CLASSIFIER_PDFTOTEXT_TIMEOUT = 300
+"""Seconds after which a pdftotext conversion is killed, or None to let
+conversions run for as long as they take. The output of pdftotext is read
+as it is written, so the time spent handling the lines read before the
+conversion ends counts as well."""
+
+CLASSIFIER_PDFTOTEXT_MEMORY_LIMIT = None
+"""Bytes of address space (RLIMIT_AS) a pdftotext or pdfinfo process can
+use, or None for no limit. Processes running out of it are stopped."""
+
+CLASSIFIER_PDFTOTEXT_CPU_LIMIT = None
+"""Seconds of CPU time (RLIMIT_CPU) a pdftotext or pdfinfo process can use,
+or None for no limit."""
+
+CLASSIFIER_TEXT_CACHE = False
+"""Cache the text extracted from files under ``CACHE_PATH``, keyed by the
+content of the files, so that they are only converted once."""
+
+CLASSIFIER_TEXT_CACHE_SIZE = 1024 * 1024 * 1024
+"""Size in bytes over which the least recently used entries of the text
+cache are removed."""
+
+CLASSIFIER_FETCH_CONCURRENCY = 4
+"""Largest number of remote sources that are fetched at the same time, and
+of connections kept open to each host."""
+
+CLASSIFIER_FETCH_RETRIES = 3
+"""Number of times a remote source is requested again after a connection
+error or a 429, 500, 502, 503 or 504 response."""
+
+CLASSIFIER_FETCH_TIMEOUT = 30
+"""Seconds after which connecting to a host, or waiting for the next bytes
+of a remote source, is given up."""
+
+CLASSIFIER_FETCH_MAX_SIZE = 100 * 1024 * 1024
+"""Size in bytes over which remote sources are not read, or None to read
+them whatever their size."""
+
 CLASSIFIER_DEFAULT_OUTPUT_NUMBER = 20
 """Number of keywords that are printed by default.
 This limits single keywords, composite keywords, and acronyms - not author
@@ -61,6 +120,16 @@ CLASSIFIER_PARTIAL_TEXT_PERCENTAGES = ((0, 20), (40, 60))
 """Marks the part of the fulltext to keep when running a partial match.
 Each tuple contains the start and end percentages of a section."""
 
+CLASSIFIER_REFERENCE_SEARCH_WINDOWS = (30, 60, 100)
+"""Percentages of the document, counted from its end, in which the reference
+section is searched for in turn. The search only widens to the next window
+when nothing was found in the previous one; ``(100,)`` scans the whole
+document at once."""
+
+CLASSIFIER_NORMALIZER_CHUNK_SIZE = 65536
+"""Approximate number of characters the normalizer washes at a time when
+the fulltext is streamed through it."""
+
 CLASSIFIER_INVARIABLE_WORDS = (
     "any",
     "big",
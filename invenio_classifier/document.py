@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Classifier document buffer.
+
+The text of a document is held once, together with the offsets of its
+lines. Cutting lines out of it or slicing it returns views that only
+record which lines they contain.
+"""
+
+from __future__ import unicode_literals
+
+import re
+from array import array
+from bisect import bisect_right
+
+# The line boundaries of str.splitlines(), other than "\n".
+_line_breaks = re.compile("\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+# Lines joined at once when reading lines from an iterable.
+_JOIN_GROUP_SIZE = 4096
+
+
+def _index_lines(lines):
+    r"""Return the start and end offsets of the lines once joined by "\n"."""
+    starts = array("l")
+    ends = array("l")
+    offset = 0
+    for line in lines:
+        starts.append(offset)
+        offset += len(line)
+        ends.append(offset)
+        offset += 1
+    return starts, ends
+
+
+def _join_lines(lines):
+    r"""Return the line offsets and the text of lines joined by "\n"."""
+    starts = array("l")
+    ends = array("l")
+    offset = 0
+    pieces = []
+    group = []
+    for line in lines:
+        starts.append(offset)
+        offset += len(line)
+        ends.append(offset)
+        offset += 1
+        group.append(line)
+        if len(group) == _JOIN_GROUP_SIZE:
+            pieces.append("\n".join(group))
+            group = []
+    if group:
+        pieces.append("\n".join(group))
+    return starts, ends, "\n".join(pieces)
+
+
+class DocumentBuffer(object):
+    """The text of a document with the offsets of its lines.
+
+    It behaves like a read-only list of the lines of the document, without
+    their line breaks, and can be passed wherever such a list is only
+    read. Slicing it, or leaving lines out of it, returns a view of the
+    same text made of runs of consecutive lines.
+    """
+
+    def __init__(self, text):
+        """Index the lines of a text, split as ``text.splitlines()`` would."""
+        if _line_breaks.search(text):
+            text = _line_breaks.sub("\n", text)
+        lines = text.split("\n")
+        if not lines[-1]:
+            # There is no line after the last line break.
+            lines.pop()
+        starts, ends = _index_lines(lines)
+        self._set(text, starts, ends, [(0, len(starts))])
+
+    @classmethod
+    def from_lines(cls, lines):
+        """Return a buffer holding the lines of a list or iterable as they are.
+
+        The lines of an iterable are joined in groups as they come, so that
+        they are not all held at once besides the text.
+        """
+        if isinstance(lines, list):
+            starts, ends = _index_lines(lines)
+            text = "\n".join(lines)
+        else:
+            starts, ends, text = _join_lines(lines)
+        document = cls.__new__(cls)
+        document._set(text, starts, ends, [(0, len(starts))])
+        return document
+
+    def _set(self, text, starts, ends, runs):
+        """Set the text, its line offsets and the lines of the view."""
+        self.text = text
+        self._starts = starts
+        self._ends = ends
+        self._runs = [(first, stop) for first, stop in runs if first < stop]
+        # Index in the view of the first line of each run.
+        self._run_indexes = [0]
+        for first, stop in self._runs:
+            self._run_indexes.append(self._run_indexes[-1] + stop - first)
+
+    def _view(self, runs):
+        """Return a view of the same text made of the given runs of lines."""
+        document = self.__class__.__new__(self.__class__)
+        document._set(self.text, self._starts, self._ends, runs)
+        return document
+
+    def _select(self, start, stop):
+        """Return the runs of lines of the view between two of its indexes."""
+        runs = []
+        for (first, run_stop), index in zip(self._runs, self._run_indexes):
+            runs.append(
+                (
+                    first + max(start - index, 0),
+                    min(run_stop, first + max(stop - index, 0)),
+                )
+            )
+        return runs
+
+    def line_number(self, index):
+        """Return the number in the whole text of a line of the view."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        run = bisect_right(self._run_indexes, index) - 1
+        return self._runs[run][0] + index - self._run_indexes[run]
+
+    def without(self, start, stop):
+        """Return a view without the lines between two indexes."""
+        stop = max(start, stop)
+        return self._view(self._select(0, start) + self._select(stop, len(self)))
+
+    def filter(self, predicate):
+        """Return a view of the lines for which the predicate is true."""
+        runs = []
+        for first, stop in self._runs:
+            for number in range(first, stop):
+                if predicate(self.text[self._starts[number] : self._ends[number]]):
+                    if runs and runs[-1][1] == number:
+                        runs[-1] = (runs[-1][0], number + 1)
+                    else:
+                        runs.append((number, number + 1))
+        return self._view(runs)
+
+    def fulltext(self):
+        r"""Return the lines of the view joined by "\n"."""
+        return "\n".join(
+            self.text[self._starts[first] : self._ends[stop - 1]]
+            for first, stop in self._runs
+        )
+
+    def __len__(self):
+        """Return the number of lines of the view."""
+        return self._run_indexes[-1]
+
+    def __getitem__(self, index):
+        """Return a line, or a view of the lines of a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._view(self._select(start, stop))
+            return [self[index] for index in range(start, stop, step)]
+        number = self.line_number(index)
+        return self.text[self._starts[number] : self._ends[number]]
+
+    def __iter__(self):
+        """Iterate over the lines of the view."""
+        text = self.text
+        starts = self._starts
+        ends = self._ends
+        for first, stop in self._runs:
+            for number in range(first, stop):
+                yield text[starts[number] : ends[number]]
@@ -34,3 +34,19 @@ class IncompatiblePDF2Text(ClassifierException):
 
 class OntologyError(ClassifierException):
     """Error with the classifier ontology."""
+
+
+class ConversionError(ClassifierException):
+    """Error while converting a document to text."""
+
+
+class ConversionTimeout(ConversionError):
+    """Error raised when a conversion was killed for running too long."""
+
+
+class ConversionLimitExceeded(ConversionError):
+    """Error raised when a conversion was stopped by a resource limit."""
+
+
+class FetchError(ClassifierException):
+    """Error while fetching a remote document."""
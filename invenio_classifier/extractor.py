@@ -19,67 +19,385 @@
 
 """Classifier text extraction from documents like PDF and text.
 
-This module also provides the utility 'is_pdf' that uses GNU file in order to
-determine if a local file is a PDF file.
+This module also provides the utility 'is_pdf' that looks for the PDF header
+in order to determine if a local file is a PDF file.
 """
 
 from __future__ import unicode_literals
 
 import codecs
+import gzip
+import io
+import itertools
+import math
+import mmap
 import os
 import re
+import signal
 import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from contextlib import contextmanager
 
-import six
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None
 
 
-from .errors import IncompatiblePDF2Text
-from .config import CLASSIFIER_PATH_GFILE, CLASSIFIER_PATH_PDFTOTEXT
+from . import textcache
+from .document import DocumentBuffer
+from .errors import ConversionError, ConversionLimitExceeded, ConversionTimeout
+from .config import (
+    CLASSIFIER_BAD_CONVERSION_SAMPLE,
+    CLASSIFIER_GFILE_FALLBACK,
+    CLASSIFIER_PARTIAL_TEXT_PERCENTAGES,
+    CLASSIFIER_PATH_GFILE,
+    CLASSIFIER_PATH_PDFINFO,
+    CLASSIFIER_PATH_PDFTOTEXT,
+    CLASSIFIER_PDFTOTEXT_CONCURRENCY,
+    CLASSIFIER_PDFTOTEXT_CPU_LIMIT,
+    CLASSIFIER_PDFTOTEXT_MEMORY_LIMIT,
+    CLASSIFIER_PDFTOTEXT_PAGES_PER_JOB,
+    CLASSIFIER_PDFTOTEXT_TIMEOUT,
+)
+from .utils import increment_stat
 import logging
 
 logger = logging.getLogger(__name__)
 
 _ONE_WORD = re.compile("[A-Za-z]{2,}", re.U)
 
+# Files are recognised from their first kilobyte, where PDF readers accept
+# the PDF header.
+_SAMPLE_SIZE = 1024
+# Size of the chunks read from streams.
+_CHUNK_SIZE = 65536
+# Size of the blocks of text files decoded at once.
+_TEXT_BLOCK_SIZE = 1 << 22
+# Lines ending with "\n" only, as io.StringIO splits them.
+_NEWLINE_LINES = re.compile("[^\n]*\n|[^\n]+")
+_PDF_MAGIC = b"%PDF-"
+_POSTSCRIPT_MAGIC = b"%!PS"
+_GZIP_MAGIC = b"\x1f\x8b"
+# The magic of POSIX and GNU tar files, at offset 257.
+_TAR_MAGIC = b"ustar"
+_ZIP_MAGICS = (b"PK\x03\x04", b"PK\x05\x06")
+# Members found in the zip files of OpenDocument, EPUB and Office Open XML
+# documents, which are not archives of documents.
+_ZIPPED_DOCUMENT_MEMBERS = frozenset(
+    ["mimetype", "META-INF/container.xml", "[Content_Types].xml"]
+)
+# Control characters other than backspace, tab, line breaks and escape,
+# which neither UTF-8 nor Latin-1 text contain.
+_BINARY_BYTES = re.compile(b"[\x00-\x07\x0e-\x1a\x1c-\x1f\x7f]")
 
-def is_pdf(document):
-    """Check if a document is a PDF file and return True if is is."""
-    if executable_exists("pdftotext"):
+# Whether an executable was found, for each executable and value of PATH.
+_executables = {}
+
+# Pattern to check for lines with a leading page-break character.
+# If this pattern is matched, we want to split the page-break into
+# its own line because we rely upon this for trying to strip headers
+# and footers, and for some other pattern matching.
+_p_break_in_line = re.compile(r"^\s*\f(.+)$", re.UNICODE)
+
+_pdfinfo_pages = re.compile(b"^Pages:\\s*(\\d+)", re.MULTILINE)
+
+# A conversion is bad when it has 3 times more whitespaces than words, and
+# is killed early when its first lines have twice as many again.
+_BAD_CONVERSION_RATIO = 3
+_CLEARLY_BAD_CONVERSION_RATIO = 6
+
+
+class ConversionService(object):
+    """Run conversion processes a bounded number at a time.
+
+    Callers wait for one of ``max_conversions`` slots before their process
+    is started, and a process still running after ``timeout`` seconds is
+    killed. The timeout runs from the start of the process until the block
+    using it is left, so it includes the time the caller spends on the
+    output before the process is done. Processes can be limited to
+    ``memory_limit`` bytes of address space and ``cpu_limit`` seconds of CPU
+    time. The number of conversions, the seconds they took and the limits
+    they hit are counted in the classifier statistics.
+    """
+
+    def __init__(
+        self, max_conversions, timeout=None, memory_limit=None, cpu_limit=None
+    ):
+        """Create a service running at most ``max_conversions`` at a time."""
+        self.max_conversions = max_conversions
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self.preexec_fn = _resource_limiter(memory_limit, cpu_limit)
+        self._slots = threading.BoundedSemaphore(max_conversions)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    @contextmanager
+    def process(self, arguments, stdin=None):
+        """Run a process in a free slot and yield it.
+
+        The standard output of the process is a pipe. The process is killed
+        if it is still running when the block is left with an exception,
+        and waited for otherwise.
+
+        :param stdin: iterable of bytes written by a thread to the standard
+            input of the process, if any. Errors raised by the iterable,
+            other than broken pipes, are raised when the block is left.
+
+        :raise ConversionTimeout: if the process was killed for running
+            longer than the timeout of the service, counted until the block
+            is left.
+        :raise ConversionLimitExceeded: if the process was stopped by the
+            memory or CPU time limit of the service.
+        """
+        with self._lock:
+            self._queued += 1
+        self._slots.acquire()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        timed_out = []
+        killed = []
+        input_errors = []
+        returncode = cpu_time = None
+        start = time.time()
         try:
-            out = subprocess.Popen(
-                ["pdftotext", "-q", document, "-"],
-                universal_newlines=True,
+            process = subprocess.Popen(
+                arguments,
+                stdin=subprocess.PIPE if stdin is not None else None,
                 stdout=subprocess.PIPE,
+                preexec_fn=self.preexec_fn,
             )
-            (stdoutdata, stderrdata) = out.communicate()
-            if stdoutdata:
-                return True
-        except IOError as ex1:
-            logger.error("Unable to read from file %s. (%s)" % (document, ex1.strerror))
+            writer = None
+            if stdin is not None:
+                writer = threading.Thread(
+                    target=_write_input, args=(stdin, process.stdin, input_errors)
+                )
+                writer.daemon = True
+                writer.start()
+            timer = None
+            if self.timeout is not None:
+                timer = threading.Timer(self.timeout, self._kill, [process, timed_out])
+                timer.daemon = True
+                timer.start()
+            try:
+                yield process
+            except BaseException:
+                if process.poll() is None:
+                    killed.append(True)
+                    process.kill()
+                raise
+            finally:
+                process.stdout.close()
+                # A process which wrote its output is left to exit, so that
+                # how it exited is known. The timer kills it if it does not.
+                returncode, cpu_time = _wait(process)
+                if timer is not None:
+                    timer.cancel()
+                if writer is not None:
+                    writer.join()
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._slots.release()
+            increment_stat("conversions")
+            increment_stat("conversion_seconds", time.time() - start)
+        if timed_out:
+            increment_stat("conversion_timeouts")
+            message = "%s was killed after %s seconds." % (arguments[0], self.timeout)
+            logger.error(message)
+            raise ConversionTimeout(message)
+        limit = None if killed else self._exceeded_limit(returncode, cpu_time)
+        if limit is not None:
+            increment_stat("conversion_%s_limits" % limit)
+            message = "%s was stopped by its %s limit." % (arguments[0], limit)
+            logger.error(message)
+            raise ConversionLimitExceeded(message)
+        if input_errors:
+            raise input_errors[0]
+
+    def _exceeded_limit(self, returncode, cpu_time=None):
+        """Return the limit, "memory" or "cpu", which stopped a process.
+
+        :param cpu_time: seconds of CPU time used by the process, or None if
+            unknown, which tell a process killed at the hard CPU time limit
+            from one killed by anything else.
+        """
+        if self.cpu_limit is not None:
+            if returncode == -signal.SIGXCPU:
+                return "cpu"
+            if (
+                returncode == -signal.SIGKILL
+                and cpu_time is not None
+                and cpu_time >= self.cpu_limit
+            ):
+                return "cpu"
+        # pdftotext and pdfinfo abort when they cannot allocate memory.
+        if self.memory_limit is not None and returncode == -signal.SIGABRT:
+            return "memory"
+        return None
+
+    def _kill(self, process, timed_out):
+        """Kill a process that ran for too long."""
+        if process.poll() is None:
+            timed_out.append(True)
+            process.kill()
+
+    def metrics(self):
+        """Return the numbers of conversions waiting for a slot and running."""
+        with self._lock:
+            return {"queued": self._queued, "running": self._running}
+
+
+def _wait(process):
+    """Wait for a process, and return its return code and CPU time.
+
+    The CPU time, in seconds, is None if it is not known: when os.wait4 is
+    not available, or when the process was already waited for by a poll.
+    """
+    if not hasattr(os, "wait4"):
+        return process.wait(), None
+    try:
+        status, rusage = os.wait4(process.pid, 0)[1:]
+    except OSError:
+        return process.wait(), None
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
     else:
-        logger.warning(
-            "GNU file was not found on the system. "
-            "Switching to a weak file extension test."
-        )
-        if document.lower().endswith(".pdf"):
-            return True
-        return False
+        process.returncode = os.WEXITSTATUS(status)
+    return process.returncode, rusage.ru_utime + rusage.ru_stime
+
 
-    # Tested with file version >= 4.10. First test is secure and works
-    # with file version 4.25. Second condition is tested for file
-    # version 4.10.
-    file_output = os.popen("file " + re.escape(document)).read()
+def _resource_limiter(memory_limit, cpu_limit):
+    """Return a function limiting the resources of a child process, or None.
+
+    The function is run in the child before it executes its program, so it
+    only sets the limits computed here.
+    """
+    if memory_limit is None and cpu_limit is None:
+        return None
+    if resource is None:
+        logger.warning("Resource limits are not supported on this system.")
+        return None
+    limits = []
+    if memory_limit is not None:
+        limits.append((resource.RLIMIT_AS, int(memory_limit), int(memory_limit)))
+    if cpu_limit is not None:
+        # SIGXCPU is sent at the soft limit, and SIGKILL a second later.
+        cpu_limit = int(math.ceil(cpu_limit))
+        limits.append((resource.RLIMIT_CPU, cpu_limit, cpu_limit + 1))
+    capped = []
+    for kind, soft, hard in limits:
+        current = resource.getrlimit(kind)[1]
+        if current != resource.RLIM_INFINITY:
+            # Children cannot raise their hard limits.
+            soft, hard = min(soft, current), min(hard, current)
+        capped.append((kind, (soft, hard)))
+
+    def limit_resources():
+        for kind, limit in capped:
+            resource.setrlimit(kind, limit)
+
+    return limit_resources
+
+
+def _write_input(chunks, pipe, errors):
+    """Write chunks of bytes to the standard input of a process."""
     try:
-        filetype = file_output.split(":")[-1]
-    except IndexError:
-        logger.error("Your version of the 'file' utility seems to be unsupported.")
-        raise IncompatiblePDF2Text("Incompatible pdftotext")
+        for chunk in chunks:
+            try:
+                pipe.write(chunk)
+            except (IOError, OSError):
+                # The process exited or was killed before reading everything.
+                return
+    except Exception as error:
+        errors.append(error)
+    finally:
+        try:
+            pipe.close()
+        except (IOError, OSError):
+            pass
+
+
+conversion_service = ConversionService(
+    CLASSIFIER_PDFTOTEXT_CONCURRENCY,
+    CLASSIFIER_PDFTOTEXT_TIMEOUT,
+    CLASSIFIER_PDFTOTEXT_MEMORY_LIMIT,
+    CLASSIFIER_PDFTOTEXT_CPU_LIMIT,
+)
+
+
+def is_pdf(document):
+    """Check if a document is a PDF file and return True if is is."""
+    try:
+        with open(document, "rb") as filestream:
+            return _PDF_MAGIC in filestream.read(_SAMPLE_SIZE)
+    except IOError as ex1:
+        logger.error("Unable to read from file %s. (%s)" % (document, ex1.strerror))
+        return False
+
+
+def sniff_file_type(sample):
+    """Return the type of a file from the bytes it starts with.
+
+    :param sample: (bytes) the first kilobyte of the file
+    :return: (string) "tar", "zip", "pdf", "postscript", "gzip" or "text",
+        or None if the type was not recognised.
+    """
+    # Archives of PDF files can have the PDF header in their first kilobyte.
+    if sample[257:262] == _TAR_MAGIC:
+        return "tar"
+    if sample.startswith(_ZIP_MAGICS):
+        return "zip"
+    if _PDF_MAGIC in sample:
+        return "pdf"
+    if sample.startswith(_POSTSCRIPT_MAGIC):
+        return "postscript"
+    if sample.startswith(_GZIP_MAGIC):
+        return "gzip"
+    if sample and not _BINARY_BYTES.search(sample):
+        return "text"
+    return None
+
+
+def _gfile_type(fpath):
+    """Return the type of a file as found by the file executable."""
+    pipe_gfile = subprocess.Popen(
+        [CLASSIFIER_PATH_GFILE, "-b", fpath],
+        stdout=subprocess.PIPE,
+        preexec_fn=conversion_service.preexec_fn,
+    )
+    res_gfile = pipe_gfile.communicate()[0].decode("utf-8", "replace").lower()
+    if "pdf" in res_gfile:
+        return "pdf"
+    if "text" in res_gfile:
+        return "text"
+    return None
+
+
+def get_file_type(fpath):
+    """Return the type of a file, as found by :see: sniff_file_type().
+
+    The type is recognised from the first bytes of the file. When it is not,
+    and ``CLASSIFIER_GFILE_FALLBACK`` is set, the file executable is asked.
 
-    pdf = filetype.find("PDF") > -1
-    # This is how it should be done however this is incompatible with
-    # file version 4.10.
-    # os.popen('file -bi ' + document).read().find("application/pdf")
-    return pdf
+    :param fpath: (string) the path to the file
+    :return: (string) the type of the file, or None if it was not recognised.
+    """
+    with open(fpath, "rb") as filestream:
+        filetype = sniff_file_type(filestream.read(_SAMPLE_SIZE))
+    if filetype is None and CLASSIFIER_GFILE_FALLBACK and CLASSIFIER_PATH_GFILE:
+        filetype = _gfile_type(fpath)
+    return filetype
 
 
 def text_lines_from_local_file(document, remote=False):
@@ -90,40 +408,387 @@ def text_lines_from_local_file(document, remote=False):
 
     @return: list of lines if st was read or an empty list
     """
+    return list(document_from_local_file(document, remote))
+
+
+def document_from_local_file(document, remote=False):
+    """Return the fulltext of the local file as a `DocumentBuffer`.
+
+    @param document: fullpath to the file that should be read
+    @param remote: boolean, if True does not count lines
+
+    @return: DocumentBuffer of the lines, empty if the file was not read
+    """
+    key = textcache.get_key(document, "document")
+    if key is not None:
+        cached_lines = textcache.load(key)
+        if cached_lines is not None:
+            return DocumentBuffer.from_lines(cached_lines)
+
     try:
         if is_pdf(document):
             if not executable_exists("pdftotext"):
                 logger.error("pdftotext is not available on the system.")
-            out = subprocess.Popen(
-                ["pdftotext", "-q", "-enc", "UTF-8", document, "-"],
-                universal_newlines=True,
-                stdout=subprocess.PIPE,
-            )
-            (stdoutdata, stderrdata) = out.communicate()
-            lines = six.ensure_text(stdoutdata, errors="replace")
-            lines = lines.splitlines()
+            lines = DocumentBuffer.from_lines(_iter_pdf_document_lines(document))
         else:
-            filestream = codecs.open(document, "r", encoding="utf8", errors="replace")
             # FIXME - we assume it is utf-8 encoded / that is not good
-            lines = [line for line in filestream]
-            filestream.close()
-    except IOError as ex1:
+            lines = DocumentBuffer.from_lines(
+                _with_one_word(iter_text_file_lines(document, errors="replace"))
+            )
+    except (IOError, OSError) as ex1:
         logger.error("Unable to read from file %s. (%s)" % (document, ex1.strerror))
-        return []
+        return DocumentBuffer("")
+
+    if key is not None and len(lines):
+        textcache.store(key, list(lines))
+    return lines
+
+
+def document_from_stream(stream):
+    """Return the fulltext of a PDF or text file object as a `DocumentBuffer`.
+
+    PDF files are written to the standard input of pdftotext as they are
+    read, and text files are decoded as UTF-8, so nothing is written to
+    disk.
+
+    @param stream: file object reading bytes
+    @return: DocumentBuffer of the lines, empty if the stream was not read
+    """
+    try:
+        sample, chunks = _peek(iter(lambda: stream.read(_CHUNK_SIZE), b""))
+        return _document_from_chunks(chunks, "pdf" if _PDF_MAGIC in sample else "text")
+    except (IOError, OSError) as ex1:
+        logger.error("Unable to read from stream. (%s)" % ex1.strerror)
+        return DocumentBuffer("")
+
+
+def _peek(chunks):
+    """Return the first kilobyte of an iterator of bytes, and all its bytes."""
+    read = []
+    size = 0
+    for chunk in chunks:
+        read.append(chunk)
+        size += len(chunk)
+        if size >= _SAMPLE_SIZE:
+            break
+    return b"".join(read)[:_SAMPLE_SIZE], itertools.chain(read, chunks)
+
+
+def _gunzip(chunks):
+    """Decompress gzipped chunks of bytes."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    data = decompressor.flush()
+    if data:
+        yield data
+
+
+def document_from_chunks(chunks):
+    """Return the fulltext of a PDF or text file read in chunks of bytes.
+
+    Gzipped files are decompressed. PDF files are written to the standard
+    input of pdftotext as the chunks come.
+
+    @param chunks: iterable of bytes
+    @return: DocumentBuffer of the lines, or None if the file is neither a
+        PDF nor a text file
+    """
+    filetype, chunks = _sniff_chunks(chunks)
+    if filetype not in ("pdf", "text"):
+        return None
+    return _document_from_chunks(chunks, filetype)
+
+
+def documents_from_chunks(chunks, name):
+    """Return the fulltexts of a file read in chunks of bytes.
+
+    Gzipped files are decompressed. The file is written to a temporary file:
+    a tar or zip archive is read as with :see: iter_archive_documents(), and
+    another file as with :see: get_plaintext_document_body().
+
+    @param chunks: iterable of bytes
+    @param name: (string) name of the file, for the messages
+    @return: list of (member name, list of lines) pairs, where the member
+        name of a PDF or text file is None, or None if the file is neither
+        a PDF file, a text file nor an archive
+    """
+    filetype, chunks = _sniff_chunks(chunks)
+    if filetype not in ("tar", "zip"):
+        textbody, status = _plaintext_document_body_from_chunks(chunks)
+        return None if status == 1 else [(None, textbody)]
+    with tempfile.TemporaryFile() as archive:
+        for chunk in chunks:
+            archive.write(chunk)
+        archive.seek(0)
+        return list(_iter_archive_members(archive, filetype, name))
+
+
+def _sniff_chunks(chunks):
+    """Return the type of a file read in chunks, and its decompressed chunks."""
+    sample, chunks = _peek(iter(chunks))
+    filetype = sniff_file_type(sample)
+    if filetype == "gzip":
+        sample, chunks = _peek(_gunzip(chunks))
+        filetype = sniff_file_type(sample)
+    return filetype, chunks
+
+
+def _document_from_chunks(chunks, filetype):
+    """Return the fulltext of a "pdf" or "text" file read in chunks."""
+    if filetype == "pdf":
+        return DocumentBuffer.from_lines(_iter_pdf_document_lines("-", stdin=chunks))
+    text = b"".join(chunks).decode("utf-8", "replace")
+    # Split as the lines of a file opened with codecs.
+    return DocumentBuffer.from_lines(_with_one_word(text.splitlines(True)))
+
+
+def get_archive_type(fpath):
+    """Return "tar" or "zip" if a file is an archive, None otherwise.
+
+    Tar files can be compressed with gzip.
+    """
+    try:
+        with open(fpath, "rb") as filestream:
+            sample = filestream.read(_SAMPLE_SIZE)
+            if sniff_file_type(sample) == "gzip":
+                filestream.seek(0)
+                sample = gzip.GzipFile(fileobj=filestream).read(_SAMPLE_SIZE)
+    except (IOError, OSError, EOFError, zlib.error):
+        return None
+    filetype = sniff_file_type(sample)
+    return filetype if filetype in ("tar", "zip") else None
+
+
+def iter_archive_documents(fpath):
+    """Yield the name and the fulltext of the PDF and text files of an archive.
+
+    The members are read one after the other, without unpacking the
+    archive. Each member is written to a temporary file and read as
+    :see: get_plaintext_document_body() reads it. Gzipped members are
+    decompressed, and members that are neither PDF nor text files are
+    skipped. Zipped documents, such as OpenDocument, EPUB and Office Open
+    XML files, are not archives and yield nothing.
+
+    @param fpath: fullpath to a zip file or to a tar file, compressed or not
+    @return: iterator of (member name, list of lines) pairs, the list being
+        empty if the conversion was bad; an archive which cannot be read is
+        logged and ends the iteration
+    """
+    return _iter_archive_members(fpath, get_archive_type(fpath), fpath)
+
+
+def _iter_archive_members(archive, archive_type, name):
+    """Yield the name and the fulltext of the PDF and text files of an archive.
+
+    @param archive: fullpath to the archive, or the archive opened in
+        binary mode
+    @param archive_type: (string) "tar" or "zip"
+    @param name: (string) name of the archive, for the messages
+    """
+    try:
+        if archive_type == "zip":
+            with zipfile.ZipFile(archive) as archive:
+                if _ZIPPED_DOCUMENT_MEMBERS.intersection(archive.namelist()):
+                    logger.info(
+                        "Skipping %s, a zipped document rather than an archive." % name
+                    )
+                    return
+                for info in archive.infolist():
+                    if info.filename.endswith("/"):
+                        continue
+                    with archive.open(info) as stream:
+                        document = _archive_member_document(info.filename, stream)
+                    if document is not None:
+                        yield info.filename, document
+        else:
+            # Read as a stream, so that compressed tar files are not seeked.
+            if hasattr(archive, "read"):
+                archive = tarfile.open(fileobj=archive, mode="r|*")
+            else:
+                archive = tarfile.open(archive, "r|*")
+            with archive:
+                for info in archive:
+                    if not info.isfile():
+                        continue
+                    document = _archive_member_document(
+                        info.name, archive.extractfile(info)
+                    )
+                    if document is not None:
+                        yield info.name, document
+    except (
+        tarfile.TarError,
+        zipfile.BadZipfile,
+        RuntimeError,
+        IOError,
+        OSError,
+        EOFError,
+        zlib.error,
+    ) as ex1:
+        # RuntimeError is raised for encrypted zip members.
+        logger.error("Unable to read archive %s. (%s)" % (name, ex1))
 
-    # Discard lines that do not contain at least one word.
-    return [line for line in lines if _ONE_WORD.search(line) is not None]
+
+def _archive_member_document(name, stream):
+    """Return the fulltext of a member of an archive, or None to skip it."""
+    try:
+        dummy, chunks = _sniff_chunks(iter(lambda: stream.read(_CHUNK_SIZE), b""))
+        textbody, status = _plaintext_document_body_from_chunks(chunks)
+    except (IOError, OSError, zlib.error, ConversionError) as ex1:
+        logger.error("Unable to read archive member %s. (%s)" % (name, ex1))
+        return None
+    if status == 1:
+        logger.info("Skipping archive member %s, not a PDF or text file." % name)
+        return None
+    return textbody
+
+
+def _plaintext_document_body_from_chunks(chunks):
+    """Return the fulltext of a file read in chunks of bytes, and a status.
+
+    The file is written to a temporary file, which is read by
+    :see: get_plaintext_document_body(), so that it is converted and decoded
+    as a local file is.
+    """
+    descriptor, fpath = tempfile.mkstemp(prefix="classifier")
+    try:
+        with os.fdopen(descriptor, "wb") as filestream:
+            for chunk in chunks:
+                filestream.write(chunk)
+        return get_plaintext_document_body(fpath)
+    finally:
+        os.remove(fpath)
+
+
+def partial_document_from_local_file(document, percentages=None):
+    """Return the pages of a PDF file searched in partial matching mode.
+
+    Only the pages covering the percentages of the file are converted.
+
+    @param document: fullpath to the PDF file
+    @param percentages: list of (start, end) percentages of the file,
+        ``CLASSIFIER_PARTIAL_TEXT_PERCENTAGES`` by default
+
+    @return: DocumentBuffer of the lines of the pages, or None if the file
+        is not a PDF file whose pages can be counted
+    """
+    if percentages is None:
+        percentages = CLASSIFIER_PARTIAL_TEXT_PERCENTAGES
+    if not is_pdf(document):
+        return None
+
+    try:
+        page_ranges = get_percentage_page_ranges(get_page_count(document), percentages)
+        if not page_ranges:
+            return None
+
+        key = textcache.get_key(document, "partial", repr(page_ranges))
+        if key is not None:
+            cached_lines = textcache.load(key)
+            if cached_lines is not None:
+                return DocumentBuffer.from_lines(cached_lines)
+
+        lines = DocumentBuffer.from_lines(
+            line
+            for pages in page_ranges
+            for line in _iter_pdf_document_lines(document, pages)
+        )
+    except (IOError, OSError) as ex1:
+        logger.error("Unable to read from file %s. (%s)" % (document, ex1.strerror))
+        return DocumentBuffer("")
+
+    if key is not None and len(lines):
+        textcache.store(key, list(lines))
+    return lines
+
+
+def _iter_pdf_document_lines(document, pages=None, stdin=None):
+    """Yield the lines of a PDF file, or of a range of its pages, with words.
+
+    The lines are split as DocumentBuffer splits a whole text.
+
+    @param document: fullpath to the PDF file, or "-" to read it from the
+        chunks of bytes of ``stdin``
+    """
+    arguments = ["pdftotext", "-q", "-enc", "UTF-8"]
+    if pages is not None:
+        arguments += ["-f", str(pages[0]), "-l", str(pages[1])]
+    lines = iter_pdftotext_lines(
+        arguments + [document, "-"], errors="replace", stdin=stdin
+    )
+    return _with_one_word(part for line in lines for part in line.splitlines())
+
+
+def iter_text_file_lines(
+    fpath, encoding="utf-8", errors="strict", universal_newlines=True
+):
+    r"""Yield the lines of a text file, with their line breaks.
+
+    The file is memory-mapped and decoded in large blocks, so that it is
+    neither read whole nor read line by line.
+
+    :param fpath: (string) the path to the file
+    :param encoding: (string) the encoding of the file
+    :param errors: (string) how to handle decoding errors
+    :param universal_newlines: (boolean) if True, the lines are split as
+        a file opened with codecs splits them, at every line boundary of
+        ``str.splitlines()``, otherwise only at "\n".
+    """
+    if universal_newlines:
+
+        def split(text):
+            return text.splitlines(True)
+
+    else:
+        split = _NEWLINE_LINES.findall
+    with open(fpath, "rb") as filestream:
+        if not os.fstat(filestream.fileno()).st_size:
+            # Empty files cannot be mapped.
+            return
+        data = mmap.mmap(filestream.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors)
+            rest = ""
+            for offset in range(0, len(data), _TEXT_BLOCK_SIZE):
+                lines = split(
+                    rest + decoder.decode(data[offset : offset + _TEXT_BLOCK_SIZE])
+                )
+                # The last line may go on in the next block, and a "\r" may
+                # be followed by a "\n" there.
+                rest = lines.pop() if lines else ""
+                for line in lines:
+                    yield line
+            for line in split(rest + decoder.decode(b"", True)):
+                yield line
+        finally:
+            data.close()
+
+
+def _with_one_word(lines):
+    """Discard lines that do not contain at least one word."""
+    return (line for line in lines if _ONE_WORD.search(line))
 
 
 def executable_exists(executable):
-    """Test if an executable is available on the system."""
-    for directory in os.getenv("PATH").split(":"):
-        if os.path.exists(os.path.join(directory, executable)):
-            return True
-    return False
+    """Test if an executable is available on the system.
+
+    The answer is remembered for as long as PATH does not change.
+    """
+    path = os.getenv("PATH", "")
+    key = (executable, path)
+    if key not in _executables:
+        _executables[key] = any(
+            os.path.exists(os.path.join(directory, executable))
+            for directory in path.split(":")
+        )
+    return _executables[key]
 
 
-def get_plaintext_document_body(fpath, keep_layout=False):
+def get_plaintext_document_body(
+    fpath, keep_layout=False, pages_per_job=CLASSIFIER_PDFTOTEXT_PAGES_PER_JOB
+):
     """Given a file-path to a full-text, return a list of unicode strings.
 
     Each string is a line of the fulltext.
@@ -132,63 +797,188 @@ def get_plaintext_document_body(fpath, keep_layout=False):
     this means converting the document to plaintext.
 
     :param fpath: (string) - the path to the fulltext file
+    :param pages_per_job: (int) - if set, PDF files are converted in
+        concurrent page ranges of this many pages.
     :return: (list) of strings - each string being a line in the document.
     """
     textbody = []
     status = 0
+    key = textcache.get_key(fpath, "plaintext", int(keep_layout))
+    if key is not None:
+        cached_textbody = textcache.load(key)
+        if cached_textbody is not None:
+            return (cached_textbody, status)
+
     if os.access(fpath, os.F_OK | os.R_OK):
         # filepath OK - attempt to extract references:
         # get file type:
-        cmd_pdftotext = [CLASSIFIER_PATH_GFILE, fpath]
-        pipe_pdftotext = subprocess.Popen(cmd_pdftotext, stdout=subprocess.PIPE)
-        res_gfile = pipe_pdftotext.stdout.read()
-
-        if (res_gfile.lower().find("text") != -1) and (
-            res_gfile.lower().find("pdf") == -1
-        ):
-            # plain-text file: don't convert - just read in:
-            f = open(fpath, "r")
+        filetype = get_file_type(fpath)
+
+        if filetype in ("text", "postscript"):
+            # plain-text or PostScript file: don't convert - just read in:
             try:
-                textbody = [line.decode("utf-8") for line in f.readlines()]
-            finally:
-                f.close()
-        elif (res_gfile.lower().find("pdf") != -1) or (
-            res_gfile.lower().find("pdfa") != -1
-        ):
+                textbody = list(iter_text_file_lines(fpath, universal_newlines=False))
+            except UnicodeDecodeError:
+                textbody = list(
+                    iter_text_file_lines(
+                        fpath, encoding="latin-1", universal_newlines=False
+                    )
+                )
+        elif filetype == "pdf":
             # convert from PDF
-            (textbody, status) = convert_PDF_to_plaintext(fpath, keep_layout)
+            (textbody, status) = convert_PDF_to_plaintext(
+                fpath, keep_layout, pages_per_job
+            )
         else:
             # invalid format
             status = 1
     else:
         # filepath not OK
         status = 1
+    if key is not None and status == 0:
+        textcache.store(key, textbody)
     return (textbody, status)
 
 
-def convert_PDF_to_plaintext(fpath, keep_layout=False):
+class ConversionQuality(object):
+    """Running counts of the words and whitespaces of a conversion."""
+
+    def __init__(self):
+        """Start with no words and no whitespaces."""
+        self.words = 0
+        self.spaces = 0
+
+    def add(self, line):
+        """Count the words and whitespaces of a line, stripped."""
+        line = line.strip()
+        words = line.split()
+        self.words += len(words)
+        self.spaces += len(line) - sum(len(word) for word in words)
+
+    def is_bad(self):
+        """Return True if the lines counted so far are a bad conversion."""
+        return self.spaces >= self.words * _BAD_CONVERSION_RATIO
+
+    def is_clearly_bad(self, sample):
+        """Return True if enough lines were counted to give up on them.
+
+        :param sample: (int) number of words and whitespaces needed
+        """
+        return (
+            self.words + self.spaces >= sample
+            and self.spaces >= self.words * _CLEARLY_BAD_CONVERSION_RATIO
+        )
+
+
+def convert_PDF_to_plaintext(
+    fpath,
+    keep_layout=False,
+    pages_per_job=None,
+    sample=CLASSIFIER_BAD_CONVERSION_SAMPLE,
+):
     """Convert PDF to txt using pdftotext.
 
     Take the path to a PDF file and run pdftotext for this file, capturing
-    the output.
+    the output. When ``pages_per_job`` is set and the file has more pages,
+    page ranges of that many pages are converted concurrently and their
+    outputs are joined in order.
 
     :param fpath: (string) path to the PDF file
+    :param pages_per_job: (int) number of pages converted by each pdftotext
+        process, or None to convert the file with a single process.
+    :param sample: (int) number of words and whitespaces after which a
+        clearly bad conversion is killed, or None to convert to the end.
+        It is ignored when the file is split in page ranges, which are
+        converted at once.
     :return: (list) of unicode strings (contents of the PDF file translated
     into plaintext; each string is a line in the document.)
     """
+    status = 0
+    cmd_pdftotext = _get_pdftotext_command(fpath, keep_layout)
+    logger.debug("* %s" % " ".join(cmd_pdftotext))
+    page_ranges = []
+    if pages_per_job:
+        page_ranges = get_page_ranges(get_page_count(fpath), pages_per_job)
+    quality = ConversionQuality()
+    if len(page_ranges) > 1:
+        # pdftotext ends every page with a page-break, so the joined outputs
+        # of the page ranges are the output of the whole file.
+        output = b"".join(_convert_page_ranges(cmd_pdftotext, page_ranges))
+        doclines = list(
+            _split_page_breaks(line.decode("utf-8") for line in io.BytesIO(output))
+        )
+        for docline in doclines:
+            quality.add(docline)
+    else:
+        doclines = []
+        pdftotext_lines = iter_pdftotext_lines(cmd_pdftotext)
+        try:
+            for docline in _split_page_breaks(pdftotext_lines):
+                doclines.append(docline)
+                quality.add(docline)
+                if sample is not None and quality.is_clearly_bad(sample):
+                    logger.warning(
+                        "* convert_PDF_to_plaintext stopped the bad conversion "
+                        "of %s." % fpath
+                    )
+                    increment_stat("conversions_aborted")
+                    break
+        finally:
+            # Kills pdftotext if the conversion was stopped.
+            pdftotext_lines.close()
+
+    logger.debug("* convert_PDF_to_plaintext found: %s lines of text" % len(doclines))
+
+    # finally, check conversion result not bad:
+    if quality.is_bad():
+        increment_stat("bad_conversions")
+        status = 2
+        doclines = []
+
+    return (doclines, status)
+
+
+def iter_PDF_to_plaintext(fpath, keep_layout=False):
+    """Yield the lines of a PDF file while pdftotext converts it.
+
+    The lines are those of `convert_PDF_to_plaintext`, which are only
+    returned once the whole file was converted and checked. Closing the
+    generator kills the conversion. The time spent on the lines before the
+    last one is read counts in the conversion timeout.
+
+    :param fpath: (string) path to the PDF file
+    """
+    pdftotext_lines = iter_pdftotext_lines(_get_pdftotext_command(fpath, keep_layout))
+    try:
+        for line in _split_page_breaks(pdftotext_lines):
+            yield line
+    finally:
+        pdftotext_lines.close()
+
+
+def iter_pdftotext_lines(arguments, errors="strict", stdin=None):
+    """Yield the lines written by pdftotext, decoded, as they are written.
+
+    The conversion runs in a slot of the conversion service and is killed
+    if the generator is closed before pdftotext is done.
+
+    :param arguments: (list) the pdftotext command
+    :param errors: (string) how to handle UTF-8 decoding errors
+    :param stdin: iterable of bytes written to pdftotext, if it reads "-"
+    """
+    with conversion_service.process(arguments, stdin=stdin) as process:
+        # readline does not wait for a full read-ahead buffer on Python 2.
+        for line in iter(process.stdout.readline, b""):
+            yield line.decode("utf-8", errors)
+
+
+def _get_pdftotext_command(fpath, keep_layout=False):
+    """Return the pdftotext command converting a PDF file to its output."""
     if keep_layout:
         layout_option = "-layout"
     else:
         layout_option = "-raw"
-    status = 0
-    doclines = []
-    # Pattern to check for lines with a leading page-break character.
-    # If this pattern is matched, we want to split the page-break into
-    # its own line because we rely upon this for trying to strip headers
-    # and footers, and for some other pattern matching.
-    p_break_in_line = re.compile(r"^\s*\f(.+)$", re.UNICODE)
-    # build pdftotext command:
-    cmd_pdftotext = [
+    return [
         CLASSIFIER_PATH_PDFTOTEXT,
         layout_option,
         "-q",
@@ -197,33 +987,117 @@ def convert_PDF_to_plaintext(fpath, keep_layout=False):
         fpath,
         "-",
     ]
-    logger.debug("* %s" % " ".join(cmd_pdftotext))
-    # open pipe to pdftotext:
-    pipe_pdftotext = subprocess.Popen(cmd_pdftotext, stdout=subprocess.PIPE)
 
-    # read back results:
-    for docline in pipe_pdftotext.stdout:
-        unicodeline = docline.decode("utf-8")
+
+def _split_page_breaks(doclines):
+    """Yield the lines of pdftotext with their leading page-breaks split out.
+
+    :param doclines: iterable of the unicode lines written by pdftotext
+    """
+    for unicodeline in doclines:
         # Check for a page-break in this line:
-        m_break_in_line = p_break_in_line.match(unicodeline)
+        m_break_in_line = _p_break_in_line.match(unicodeline)
         if m_break_in_line is None:
             # There was no page-break in this line. Just add the line:
-            doclines.append(unicodeline)
+            yield unicodeline
         else:
             # If there was a page-break character in the same line as some
             # text, split it out into its own line so that we can later
             # try to find headers and footers:
-            doclines.append("\f")
-            doclines.append(m_break_in_line.group(1))
+            yield "\f"
+            yield m_break_in_line.group(1)
 
-    logger.debug("* convert_PDF_to_plaintext found: %s lines of text" % len(doclines))
 
-    # finally, check conversion result not bad:
-    if pdftotext_conversion_is_bad(doclines):
-        status = 2
-        doclines = []
+def get_page_count(fpath):
+    """Return the number of pages of a PDF file, or None if it is unknown."""
+    if not CLASSIFIER_PATH_PDFINFO:
+        return None
+    with conversion_service.process([CLASSIFIER_PATH_PDFINFO, fpath]) as process:
+        output = process.stdout.read()
+    match = _pdfinfo_pages.search(output)
+    if match is None:
+        return None
+    return int(match.group(1))
 
-    return (doclines, status)
+
+def get_page_ranges(page_count, pages_per_job):
+    """Return the first and last pages of the ranges covering a document.
+
+    :param page_count: (int) number of pages of the document, or None
+    :param pages_per_job: (int) number of pages in each range
+    :return: (list) of (first, last) page numbers, counted from 1
+    """
+    if not page_count:
+        return []
+    return [
+        (first, min(first + pages_per_job - 1, page_count))
+        for first in range(1, page_count + 1, pages_per_job)
+    ]
+
+
+def get_percentage_page_ranges(page_count, percentages):
+    """Return the first and last pages covering percentages of a document.
+
+    :param page_count: (int) number of pages of the document, or None
+    :param percentages: list of (start, end) percentages of the document
+    :return: (list) of (first, last) page numbers, counted from 1, in
+        order; overlapping and adjacent ranges are merged, so that no page
+        is converted twice
+    """
+    if not page_count:
+        return []
+    page_ranges = []
+    for start, end in sorted(percentages):
+        first = min(int(start * page_count / 100.0) + 1, page_count)
+        last = max(first, min(int(math.ceil(end * page_count / 100.0)), page_count))
+        if page_ranges and first <= page_ranges[-1][1] + 1:
+            first, previous_last = page_ranges.pop()
+            last = max(previous_last, last)
+        page_ranges.append((first, last))
+    return page_ranges
+
+
+def _convert_page_ranges(cmd_pdftotext, page_ranges):
+    """Run pdftotext on page ranges concurrently and return their outputs.
+
+    At most as many ranges as the conversion service runs at a time are
+    converted at once, each by its own thread.
+
+    :param cmd_pdftotext: (list) the pdftotext command for the whole file
+    :param page_ranges: (list) of (first, last) page numbers
+    :return: (list) of the outputs of the ranges, as bytes, in order
+    """
+    outputs = [None] * len(page_ranges)
+    pending = list(range(len(page_ranges)))
+    errors = []
+    lock = threading.Lock()
+
+    def convert():
+        while True:
+            with lock:
+                if errors or not pending:
+                    return
+                index = pending.pop(0)
+            first, last = page_ranges[index]
+            cmd = cmd_pdftotext[:1] + ["-f", str(first), "-l", str(last)]
+            try:
+                with conversion_service.process(cmd + cmd_pdftotext[1:]) as process:
+                    outputs[index] = process.stdout.read()
+            except Exception as error:
+                with lock:
+                    errors.append(error)
+
+    threads = [
+        threading.Thread(target=convert)
+        for _ in range(min(len(page_ranges), conversion_service.max_conversions))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return outputs
 
 
 def pdftotext_conversion_is_bad(txtlines):
@@ -241,16 +1115,8 @@ def pdftotext_conversion_is_bad(txtlines):
     :return: (integer) - 1 if bad conversion; 0 if good conversion.
     """
     # Numbers of 'words' and 'whitespaces' found in document:
-    numWords = numSpaces = 0
-    # whitespace character pattern:
-    p_space = re.compile(six.text_type(r"(\s)"), re.UNICODE)
-    # non-whitespace 'word' pattern:
-    p_noSpace = re.compile(six.text_type(r"(\S+)"), re.UNICODE)
+    quality = ConversionQuality()
     for txtline in txtlines:
-        numWords = numWords + len(p_noSpace.findall(txtline.strip()))
-        numSpaces = numSpaces + len(p_space.findall(txtline.strip()))
-    if numSpaces >= (numWords * 3):
-        # Too many spaces - probably bad conversion
-        return True
-    else:
-        return False
+        quality.add(txtline)
+    # Too many spaces - probably bad conversion
+    return quality.is_bad()
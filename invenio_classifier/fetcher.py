@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Classifier fetching of remote documents.
+
+Documents are requested over a pool of HTTP connections. Their content is
+written to a temporary file as it is received, and read as a local file is
+read; the PDF and text files of tar and zip archives are read without
+unpacking them.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import logging
+import threading
+from contextlib import closing
+
+from .config import (
+    CLASSIFIER_FETCH_CONCURRENCY,
+    CLASSIFIER_FETCH_MAX_SIZE,
+    CLASSIFIER_FETCH_RETRIES,
+    CLASSIFIER_FETCH_TIMEOUT,
+)
+from .errors import ConversionError, FetchError
+from .extractor import document_from_chunks, documents_from_chunks
+from .utils import increment_stat
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 65536
+# Responses which are requested again.
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class Fetcher(object):
+    """Fetch remote documents with a pool of HTTP connections.
+
+    The session is only created, and requests imported, when the first
+    document is fetched. Fetched documents and bytes, and the errors, are
+    counted in the classifier statistics.
+    """
+
+    def __init__(
+        self,
+        concurrency=CLASSIFIER_FETCH_CONCURRENCY,
+        retries=CLASSIFIER_FETCH_RETRIES,
+        timeout=CLASSIFIER_FETCH_TIMEOUT,
+        max_size=CLASSIFIER_FETCH_MAX_SIZE,
+        backoff_factor=0.5,
+    ):
+        """Create a fetcher running at most ``concurrency`` requests at once."""
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.max_size = max_size
+        self.backoff_factor = backoff_factor
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Return the session, creating it if needed."""
+        with self._lock:
+            if self._session is None:
+                self._session = self._make_session()
+            return self._session
+
+    def _make_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=_RETRY_STATUSES,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.concurrency,
+            pool_maxsize=self.concurrency,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def fetch(self, url):
+        """Return the fulltext of the PDF or text file at a URL.
+
+        :param url: (string) the URL of the document
+        :return: DocumentBuffer of the lines, or None if the document is
+            neither a PDF nor a text file
+        :raise FetchError: if the document cannot be fetched, or is larger
+            than the size limit.
+        """
+        with closing(self._get(url)) as response:
+            return document_from_chunks(self._iter_content(url, response))
+
+    def fetch_documents(self, url):
+        """Return the fulltexts of the document or of the archive at a URL.
+
+        :param url: (string) the URL of the document
+        :return: list of (member name, list of lines) pairs: the member
+            name is None for a PDF or text file, and the name of each PDF
+            and text file of a tar or zip archive otherwise. The fulltext of
+            other files is None.
+        :raise FetchError: if the document cannot be fetched, or is larger
+            than the size limit.
+        """
+        with closing(self._get(url)) as response:
+            documents = documents_from_chunks(self._iter_content(url, response), url)
+        if documents is None:
+            logger.info("Skipping %s, not a PDF, text or archive file." % url)
+            return [(None, None)]
+        return documents
+
+    def _get(self, url):
+        """Return the streamed response to a request of a URL."""
+        import requests
+
+        increment_stat("fetches")
+        logger.info("Fetching %s." % url)
+        try:
+            response = self.session.get(url, stream=True, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as error:
+            increment_stat("fetch_errors")
+            raise FetchError("Unable to fetch %s. (%s)" % (url, error))
+        length = response.headers.get("content-length", "")
+        if self._too_large(int(length) if length.isdigit() else 0):
+            response.close()
+            increment_stat("fetch_errors")
+            raise FetchError("%s is larger than %s bytes." % (url, self.max_size))
+        return response
+
+    def _too_large(self, size):
+        return self.max_size is not None and size > self.max_size
+
+    def _iter_content(self, url, response):
+        """Yield the bytes of a response, up to the size limit."""
+        import requests
+
+        size = 0
+        try:
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                size += len(chunk)
+                if self._too_large(size):
+                    raise FetchError(
+                        "%s is larger than %s bytes." % (url, self.max_size)
+                    )
+                increment_stat("fetched_bytes", len(chunk))
+                yield chunk
+        except requests.RequestException as error:
+            increment_stat("fetch_errors")
+            raise FetchError("Unable to fetch %s. (%s)" % (url, error))
+        except FetchError:
+            increment_stat("fetch_errors")
+            raise
+
+    def fetch_all(self, urls):
+        """Yield the URLs and the fulltexts of their documents, in order.
+
+        Up to ``concurrency`` documents are fetched at once, so the next
+        documents are fetched while one is used. The documents of a URL are
+        those returned by :see: fetch_documents(); the fulltext of documents
+        that cannot be fetched, or that are neither PDF, text nor archive
+        files, is None.
+
+        :param urls: iterable of URLs
+        :return: iterator of (url, member name, list of lines) triples
+        """
+        pending = collections.deque()
+        for url in urls:
+            pending.append(_FetchThread(self, url))
+            pending[-1].start()
+            if len(pending) >= self.concurrency:
+                for document in pending.popleft().result():
+                    yield document
+        while pending:
+            for document in pending.popleft().result():
+                yield document
+
+
+class _FetchThread(threading.Thread):
+    """Fetch a document in a thread."""
+
+    def __init__(self, fetcher, url):
+        super(_FetchThread, self).__init__()
+        self.daemon = True
+        self.fetcher = fetcher
+        self.url = url
+        self.documents = [(None, None)]
+
+    def run(self):
+        try:
+            self.documents = self.fetcher.fetch_documents(self.url)
+        except FetchError as error:
+            logger.error("%s" % error)
+        except ConversionError as error:
+            logger.error("Unable to convert %s. (%s)" % (self.url, error))
+        except Exception:
+            logger.exception("Unable to extract the text of %s." % self.url)
+
+    def result(self):
+        """Wait for the documents, and return them with the URL."""
+        self.join()
+        return [(self.url, member, document) for member, document in self.documents]
+
+
+default_fetcher = Fetcher()
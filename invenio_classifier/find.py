@@ -19,12 +19,14 @@
 
 """Finding the reference section from the fulltext."""
 
+import math
 import re
 
 import logging
 
+from .config import CLASSIFIER_REFERENCE_SEARCH_WINDOWS
 from .regexs import (
-    get_post_reference_section_keyword_patterns,
+    combine_patterns,
     get_post_reference_section_title_patterns,
     get_reference_line_numeration_marker_patterns,
     get_reference_section_title_patterns,
@@ -32,13 +34,68 @@ from .regexs import (
     re_reference_line_bracket_markers,
     re_reference_line_dot_markers,
     re_reference_line_number_markers,
+    re_reference_section_title_start,
     regex_match_list,
 )
+from .utils import increment_stat
 
 logger = logging.getLogger(__name__)
+_reference_patterns = {}
+# The section title patterns share a long prefix, which an alternation
+# re-runs for each branch: they are faster to try one by one.
+_UNCOMBINED_BUILDERS = frozenset([get_reference_section_title_patterns])
+_title_marker_patterns = {}
+# Titles vary from document to document: only keep the marker patterns of a
+# bounded number of them.
+_MAX_TITLE_MARKER_PATTERNS = 64
 
 
-def find_reference_section(docbody):
+def _get_patterns(builder):
+    """Return the compiled patterns of a builder, building them only once.
+
+    Unless the builder is known to be faster as a list, the patterns are
+    merged into one regex, so that each line is matched once.
+    """
+    if builder not in _reference_patterns:
+        patterns = builder()
+        if builder not in _UNCOMBINED_BUILDERS:
+            patterns = combine_patterns(patterns)
+        _reference_patterns[builder] = patterns
+    return _reference_patterns[builder]
+
+
+def _get_title_marker_patterns(title):
+    """Return the marker patterns for reference lines starting with a title."""
+    if title not in _title_marker_patterns:
+        if len(_title_marker_patterns) >= _MAX_TITLE_MARKER_PATTERNS:
+            _title_marker_patterns.clear()
+        _title_marker_patterns[title] = combine_patterns(
+            get_reference_line_numeration_marker_patterns(title)
+        )
+    return _title_marker_patterns[title]
+
+
+def _get_search_windows(length, windows=None):
+    """Return the line ranges in which to search for the reference section.
+
+    The (start, end) ranges follow each other from the end of the document
+    backwards and together cover all of its lines.
+    """
+    if windows is None:
+        windows = CLASSIFIER_REFERENCE_SEARCH_WINDOWS
+    ranges = []
+    end = length
+    for percentage in sorted(windows):
+        start = max(length - int(math.ceil(length * percentage / 100.0)), 0)
+        if start < end:
+            ranges.append((start, end))
+            end = start
+    if end > 0:
+        ranges.append((0, end))
+    return ranges
+
+
+def find_reference_section(docbody, windows=None):
     """Search in document body for its reference section.
 
     More precisely, find
@@ -46,7 +103,12 @@ def find_reference_section(docbody):
     at the end of a document and works backwards, line-by-line, looking for
     the title of a reference section. It stops when (if) it finds something
     that it considers to be the first line of a reference section.
+    The lines are searched window by window (see
+    CLASSIFIER_REFERENCE_SEARCH_WINDOWS): the search stops at the end of a
+    window in which a title followed by a reference marker was found.
     @param docbody: (list) of strings - the full document body.
+    @param windows: (tuple) of percentages overriding the configured
+        search windows.
     @return: (dictionary) :
         { 'start_line' : (integer) - index in docbody of 1st reference line,
           'title_string' : (string) - title of the reference section.
@@ -63,46 +125,56 @@ def find_reference_section(docbody):
                 (None) - when the reference section could not be found.
     """
     ref_details = None
-    title_patterns = get_reference_section_title_patterns()
-
-    # Try to find refs section title:
-    for reversed_index, line in enumerate(reversed(docbody)):
-        title_match = regex_match_list(line, title_patterns)
-        if title_match:
-            title = title_match.group("title")
-            index = len(docbody) - 1 - reversed_index
-            temp_ref_details, found_title = find_numeration(
-                docbody[index : index + 6], title
-            )
-            if temp_ref_details:
-                if (
-                    ref_details
-                    and "title" in ref_details
-                    and ref_details["title"]
-                    and not temp_ref_details["title"]
-                ):
-                    continue
-                if (
-                    ref_details
-                    and "marker" in ref_details
-                    and ref_details["marker"]
-                    and not temp_ref_details["marker"]
-                ):
-                    continue
-
-                ref_details = temp_ref_details
-                ref_details["start_line"] = index
-                ref_details["title_string"] = title
+    title_patterns = _get_patterns(get_reference_section_title_patterns)
+    found = False
 
-            if found_title:
-                break
+    for window, (start, end) in enumerate(_get_search_windows(len(docbody), windows)):
+        if found or (ref_details and ref_details["marker"]):
+            break
+        if window == 1:
+            increment_stat("reference_search_widened")
+
+        # Try to find refs section title:
+        for index in range(end - 1, start - 1, -1):
+            line = docbody[index]
+            if not re_reference_section_title_start.search(line):
+                continue
+            title_match = regex_match_list(line, title_patterns)
+            if title_match:
+                title = title_match.group("title")
+                temp_ref_details, found_title = find_numeration(
+                    docbody[index : index + 6], title
+                )
+                if temp_ref_details:
+                    if (
+                        ref_details
+                        and "title" in ref_details
+                        and ref_details["title"]
+                        and not temp_ref_details["title"]
+                    ):
+                        continue
+                    if (
+                        ref_details
+                        and "marker" in ref_details
+                        and ref_details["marker"]
+                        and not temp_ref_details["marker"]
+                    ):
+                        continue
+
+                    ref_details = temp_ref_details
+                    ref_details["start_line"] = index
+                    ref_details["title_string"] = title
+
+                if found_title:
+                    found = True
+                    break
 
     return ref_details
 
 
 def find_numeration_in_body(docbody):
     """Find numeration in body."""
-    marker_patterns = get_reference_line_numeration_marker_patterns()
+    marker_patterns = _get_patterns(get_reference_line_numeration_marker_patterns)
     ref_details = None
     found_title = False
 
@@ -157,7 +229,7 @@ def find_numeration_in_title(docbody, title):
     # Need to escape to avoid problems like 'References['
     title = re.escape(title)
 
-    mk_with_title_ptns = get_reference_line_numeration_marker_patterns(title)
+    mk_with_title_ptns = _get_title_marker_patterns(title)
     mk_with_title_match = regex_match_list(first_line, mk_with_title_ptns)
     if mk_with_title_match:
         mk = mk_with_title_match.group("mark")
@@ -210,7 +282,7 @@ def find_numeration(docbody, title):
     return ref_details, found_title
 
 
-def find_reference_section_no_title_via_brackets(docbody):
+def find_reference_section_no_title_via_brackets(docbody, start=0, end=None):
     """Find reference section via numeric markers.
 
     This function would generally be used when it was not possible to locate
@@ -219,6 +291,9 @@ def find_reference_section_no_title_via_brackets(docbody):
     markers of the format [1], [2], etc.
 
     @param docbody: (list) of strings -each string is a line in the document.
+    @param start: (integer) index of the first line to search.
+    @param end: (integer) index after the last line to search, defaults to
+        the end of the document.
     @return: (dictionary) :
      { 'start_line' : (integer) - index in docbody of 1st reference line,
        'title_string' : (None) - title of the reference section
@@ -235,10 +310,10 @@ def find_reference_section_no_title_via_brackets(docbody):
             (None) - when the reference section could not be found.
     """
     marker_patterns = [re_reference_line_bracket_markers]
-    return find_reference_section_no_title_generic(docbody, marker_patterns)
+    return find_reference_section_no_title_generic(docbody, marker_patterns, start, end)
 
 
-def find_reference_section_no_title_via_dots(docbody):
+def find_reference_section_no_title_via_dots(docbody, start=0, end=None):
     """Find reference section via dots.
 
     This function would generally be used when it was not possible to locate
@@ -246,6 +321,9 @@ def find_reference_section_no_title_via_dots(docbody):
     Instead, this function will look for reference lines that have numeric
     markers of the format 1., 2., etc.
     @param docbody: (list) of strings -each string is a line in the document.
+    @param start: (integer) index of the first line to search.
+    @param end: (integer) index after the last line to search, defaults to
+        the end of the document.
     @return: (dictionary) :
      { 'start_line' : (integer) - index in docbody of 1st reference line,
        'title_string' : (None) - title of the reference section
@@ -262,10 +340,10 @@ def find_reference_section_no_title_via_dots(docbody):
             (None) - when the reference section could not be found.
     """
     marker_patterns = [re_reference_line_dot_markers]
-    return find_reference_section_no_title_generic(docbody, marker_patterns)
+    return find_reference_section_no_title_generic(docbody, marker_patterns, start, end)
 
 
-def find_reference_section_no_title_via_numbers(docbody):
+def find_reference_section_no_title_via_numbers(docbody, start=0, end=None):
     """Find reference section via numbers.
 
     This function would generally be used when it was not possible to locate
@@ -273,6 +351,9 @@ def find_reference_section_no_title_via_numbers(docbody):
     Instead, this function will look for reference lines that have numeric
     markers of the format 1, 2, etc.
     @param docbody: (list) of strings -each string is a line in the document.
+    @param start: (integer) index of the first line to search.
+    @param end: (integer) index after the last line to search, defaults to
+        the end of the document.
     @return: (dictionary) :
      { 'start_line' : (integer) - index in docbody of 1st reference line,
        'title_string' : (None) - title of the reference section
@@ -289,10 +370,12 @@ def find_reference_section_no_title_via_numbers(docbody):
             (None) - when the reference section could not be found.
     """
     marker_patterns = [re_reference_line_number_markers]
-    return find_reference_section_no_title_generic(docbody, marker_patterns)
+    return find_reference_section_no_title_generic(docbody, marker_patterns, start, end)
 
 
-def find_reference_section_no_title_generic(docbody, marker_patterns):
+def find_reference_section_no_title_generic(
+    docbody, marker_patterns, start=0, end=None
+):
     """Find reference section.
 
     This function would generally be used when it was not possible to locate
@@ -301,6 +384,9 @@ def find_reference_section_no_title_generic(docbody, marker_patterns):
     markers of the format [1], [2], {1}, {2}, etc.
 
     @param docbody: (list) of strings -each string is a line in the document.
+    @param start: (integer) index of the first line to search.
+    @param end: (integer) index after the last line to search, defaults to
+        the end of the document.
     @return: (dictionary) :
      { 'start_line' : (integer) - index in docbody of 1st reference line,
        'title_string' : (None) - title of the reference section
@@ -318,13 +404,16 @@ def find_reference_section_no_title_generic(docbody, marker_patterns):
     """
     if not docbody:
         return None
+    if end is None:
+        end = len(docbody)
 
     ref_start_line = ref_line_marker = None
 
     # try to find first reference line in the reference section:
     found_ref_sect = False
 
-    for reversed_index, line in enumerate(reversed(docbody)):
+    for line_index in range(end - 1, start - 1, -1):
+        line = docbody[line_index]
         mark_match = regex_match_list(line.strip(), marker_patterns)
         if mark_match and mark_match.group("marknum") == "1":
             # Get marker recognition pattern:
@@ -333,7 +422,7 @@ def find_reference_section_no_title_generic(docbody, marker_patterns):
             # Look for [2] in next 10 lines:
             next_test_lines = 10
 
-            index = len(docbody) - reversed_index
+            index = line_index + 1
             zone_to_check = docbody[index : index + next_test_lines]
             if len(zone_to_check) < 5:
                 # We found a 1 towards the end, we assume
@@ -351,7 +440,7 @@ def find_reference_section_no_title_generic(docbody, marker_patterns):
             if found:
                 # Found next reference line:
                 found_ref_sect = True
-                ref_start_line = len(docbody) - 1 - reversed_index
+                ref_start_line = line_index
                 ref_line_marker = mark_match.group("mark")
                 ref_line_marker_pattern = mark_pattern
                 break
@@ -371,6 +460,52 @@ def find_reference_section_no_title_generic(docbody, marker_patterns):
     return ref_sectn_details
 
 
+class _ReferenceLines(object):
+    """Per-line tables of the search for the end of the reference section.
+
+    The search looks at the lines following a candidate section title
+    again and again; each line is stripped, matched against the marker
+    patterns and reduced to its digits at most once.
+    """
+
+    def __init__(self, docbody, mk_patterns):
+        """Prepare empty tables for the lines of the document."""
+        self.docbody = docbody
+        self.mk_patterns = mk_patterns
+        self._stripped = {}
+        self._markers = {}
+        self._digits = {}
+
+    def stripped(self, index):
+        """Return the stripped line."""
+        if index not in self._stripped:
+            self._stripped[index] = self.docbody[index].strip()
+        return self._stripped[index]
+
+    def marker(self, index):
+        """Return the match of a reference marker at the start of the line."""
+        if index not in self._markers:
+            self._markers[index] = regex_match_list(
+                self.stripped(index), self.mk_patterns
+            )
+        return self._markers[index]
+
+    def digits(self, index):
+        """Return the line without spaces and the signs used with numbers."""
+        if index not in self._digits:
+            self._digits[index] = (
+                self.docbody[index]
+                .replace(" ", "")
+                .replace(".", "")
+                .replace("-", "")
+                .replace("+", "")
+                .replace("\u00d7", "")
+                .replace("\u2212", "")
+                .strip()
+            )
+        return self._digits[index]
+
+
 def find_end_of_reference_section(
     docbody, ref_start_line, ref_line_marker, ref_line_marker_ptn
 ):
@@ -400,18 +535,18 @@ def find_end_of_reference_section(
         # Can't safely find end of refs with this info - quit.
         return None
     # Get patterns for testing line:
-    t_patterns = get_post_reference_section_title_patterns()
-    kw_patterns = get_post_reference_section_keyword_patterns()
+    t_patterns = _get_patterns(get_post_reference_section_title_patterns)
 
     if None not in (ref_line_marker, ref_line_marker_ptn):
         mk_patterns = [re.compile(ref_line_marker_ptn, re.I | re.UNICODE)]
     else:
-        mk_patterns = get_reference_line_numeration_marker_patterns()
+        mk_patterns = _get_patterns(get_reference_line_numeration_marker_patterns)
 
+    lines = _ReferenceLines(docbody, mk_patterns)
     current_reference_count = 0
     while x < len(docbody) and not section_ended:
         # save the reference count
-        num_match = regex_match_list(docbody[x].strip(), mk_patterns)
+        num_match = lines.marker(x)
         if num_match:
             try:
                 current_reference_count = int(num_match.group("marknum"))
@@ -419,18 +554,14 @@ def find_end_of_reference_section(
                 # non numerical references marking
                 pass
         # look for a likely section title that would follow a reference section
-        end_match = regex_match_list(docbody[x].strip(), t_patterns)
-        if not end_match:
-            # didn't match a section title - try looking for keywords that
-            # suggest the end of a reference section:
-            end_match = regex_match_list(docbody[x].strip(), kw_patterns)
-        else:
+        end_match = regex_match_list(lines.stripped(x), t_patterns)
+        if end_match:
             # Is it really the end of the reference section? Check within the
             # next 5 lines for other reference numeration markers:
             y = x + 1
             line_found = False
             while y < x + 200 and y < len(docbody) and not line_found:
-                num_match = regex_match_list(docbody[y].strip(), mk_patterns)
+                num_match = lines.marker(y)
                 if num_match and not num_match.group(0).isdigit():
                     try:
                         num = int(num_match.group("marknum"))
@@ -452,32 +583,14 @@ def find_end_of_reference_section(
         if not section_ended:
             # Does this & the next 5 lines simply contain numbers? If yes, it's
             # probably the axis scale of a graph in a fig. End refs section
-            digit_test_str = (
-                docbody[x]
-                .replace(" ", "")
-                .replace(".", "")
-                .replace("-", "")
-                .replace("+", "")
-                .replace("\u00d7", "")
-                .replace("\u2212", "")
-                .strip()
-            )
+            digit_test_str = lines.digits(x)
             if len(digit_test_str) > 10 and digit_test_str.isdigit():
                 # The line contains only digits and is longer than 10 chars:
                 y = x + 1
                 digit_lines = 4
                 num_digit_lines = 1
                 while y < x + digit_lines and y < len(docbody):
-                    digit_test_str = (
-                        docbody[y]
-                        .replace(" ", "")
-                        .replace(".", "")
-                        .replace("-", "")
-                        .replace("+", "")
-                        .replace("\u00d7", "")
-                        .replace("\u2212", "")
-                        .strip()
-                    )
+                    digit_test_str = lines.digits(y)
                     if len(digit_test_str) > 10 and digit_test_str.isdigit():
                         num_digit_lines += 1
                     elif len(digit_test_str) == 0:
@@ -507,23 +620,24 @@ def get_reference_section_beginning(fulltext):
     if sect_start is not None:
         sect_start["how_found_start"] = 1
     else:
-        # No references found - try with no title option
-        sect_start = find_reference_section_no_title_via_brackets(fulltext)
-        if sect_start is not None:
-            sect_start["how_found_start"] = 2
-        # Try weaker set of patterns if needed
-        if sect_start is None:
-            # No references found - try with no title option (with weaker
-            # patterns..)
-            sect_start = find_reference_section_no_title_via_dots(fulltext)
-            if sect_start is not None:
-                sect_start["how_found_start"] = 3
-            if sect_start is None:
-                # No references found - try with no title option (with even
-                # weaker patterns..)
-                sect_start = find_reference_section_no_title_via_numbers(fulltext)
+        # No references found - try with no title option, with weaker and
+        # weaker patterns. Each pattern is searched in all the windows
+        # before the next, weaker one is tried.
+        increment_stat("reference_search_no_title")
+        no_title_searches = (
+            (find_reference_section_no_title_via_brackets, 2),
+            (find_reference_section_no_title_via_dots, 3),
+            (find_reference_section_no_title_via_numbers, 4),
+        )
+        windows = _get_search_windows(len(fulltext))
+        for search, how_found_start in no_title_searches:
+            for start, end in windows:
+                sect_start = search(fulltext, start, end)
                 if sect_start is not None:
-                    sect_start["how_found_start"] = 4
+                    sect_start["how_found_start"] = how_found_start
+                    break
+            if sect_start is not None:
+                break
 
     if sect_start:
         logger.debug("* title %r" % sect_start["title_string"])
@@ -33,12 +33,19 @@ from __future__ import unicode_literals
 import re
 
 from six import iteritems
-from .find import find_end_of_reference_section, find_reference_section
+
+from .config import CLASSIFIER_NORMALIZER_CHUNK_SIZE
+from .document import DocumentBuffer
+from .find import (
+    find_end_of_reference_section,
+    find_reference_section,
+)
 
 import logging
 
 logger = logging.getLogger(__name__)
 _washing_regex = []
+_starts_with_letter = re.compile("[A-Za-z]")
 
 
 def get_washing_regex():
@@ -147,12 +154,61 @@ def normalize_fulltext(fulltext):
     """Return a 'cleaned' version of the output provided by pdftotext."""
     # We recognize keywords by the spaces. We need these to match the
     # first and last words of the document.
-    fulltext = " " + fulltext + " "
+    return _normalize(" " + fulltext + " ")
+
+
+def normalize_stream(text_lines, chunk_size=None):
+    r"""Yield a 'cleaned' version of the text lines chunk by chunk.
+
+    The concatenation of the chunks is equal to
+    ``normalize_fulltext("\n".join(text_lines))``, but only about
+    ``chunk_size`` characters are held and washed at a time, so the lines
+    can come straight from an iterator. A caller joining the chunks still
+    holds the whole normalized text, but not the copies of the whole text
+    that each washing pass of ``normalize_fulltext`` makes.
+
+    Chunks are only cut in front of a line starting with an ASCII letter:
+    none of the replacements or washing regexes can match across such a
+    line break, so every chunk can be washed on its own, with the line
+    break in front of it carried over as left context.
+
+    :param text_lines: iterable of strings
+    :param chunk_size: approximate number of characters per chunk
+    """
+    if chunk_size is None:
+        chunk_size = CLASSIFIER_NORMALIZER_CHUNK_SIZE
+
+    pending = []
+    pending_size = 0
+    first = True
+    for line in text_lines:
+        if pending_size >= chunk_size and _starts_with_letter.match(line):
+            chunk = "\n".join(pending) + "\n"
+            if first:
+                yield _normalize(" " + chunk)
+                first = False
+            else:
+                yield _normalize("\n" + chunk)[1:]
+            pending = []
+            pending_size = 0
+        pending.append(line)
+        pending_size += len(line) + 1
+
+    chunk = "\n".join(pending) + " "
+    if first:
+        yield _normalize(" " + chunk)
+    else:
+        yield _normalize("\n" + chunk)[1:]
+
 
+def _normalize(fulltext):
+    """Replace the undesirable characters and apply the washing regexes."""
+    # Only the replacements for characters that occur in the text are run.
+    present = _get_special_characters(fulltext)
     # Replace some weird unicode characters.
-    fulltext = replace_undesirable_characters(fulltext)
+    fulltext = replace_undesirable_characters(fulltext, present)
     # Replace the greek characters by their name.
-    fulltext = _replace_greek_characters(fulltext)
+    fulltext = _replace_greek_characters(fulltext, present)
 
     washing_regex = get_washing_regex()
 
@@ -167,7 +223,11 @@ def normalize_fulltext(fulltext):
 
 
 def cut_references(text_lines):
-    """Return the text lines with the references cut."""
+    """Return the text lines with the references cut.
+
+    A list of lines is cut in place, while a `DocumentBuffer` is left as it
+    is and a view of it without the references is returned.
+    """
     ref_sect_start = find_reference_section(text_lines)
     if ref_sect_start is not None:
         start = ref_sect_start["start_line"]
@@ -177,6 +237,8 @@ def cut_references(text_lines):
             ref_sect_start["marker"],
             ref_sect_start["marker_pattern"],
         )
+        if isinstance(text_lines, DocumentBuffer):
+            return text_lines.without(start, end + 1)
         del text_lines[start : end + 1]
     else:
         logger.warning("Found no references to remove.")
@@ -664,30 +726,93 @@ UNDESIRABLE_STRING_REPLACEMENTS = [
 ]
 
 
-def replace_undesirable_characters(line):
+_special_character = re.compile("[^\t\n !-_a-~]")
+_ascii_special_character = re.compile("[\x00-\x08\x0b-\x1f`\x7f]")
+_non_ascii_character = re.compile("[^\x00-\x7f]")
+_replacement_rules = {}
+
+
+def _is_ascii(text):
+    """Check if a string only contains ASCII characters."""
+    try:
+        return text.isascii()
+    except AttributeError:
+        # CPython <3.7
+        return _non_ascii_character.search(text) is None
+
+
+def _get_special_characters(text):
+    """Return the set of characters of a text that can start a replacement.
+
+    Every key of the replacement tables contains at least one character
+    that is not printable ASCII (or is a backtick), so for a pure ASCII
+    text only its control characters need to be looked for.
+    """
+    if _is_ascii(text):
+        return set(_ascii_special_character.findall(text))
+    return set(_special_character.findall(text))
+
+
+def _get_replacement_rules(replacements):
+    """Return the rules of a replacement table, keeping its order.
+
+    Each rule is a tuple (bad string, replacement, trigger, introduced):
+    the replacement can only apply if the trigger character is present in
+    the text, and applying it may add the introduced characters.
+    """
+    key = id(replacements)
+    if key not in _replacement_rules:
+        if isinstance(replacements, dict):
+            replacements = iteritems(replacements)
+        _replacement_rules[key] = [
+            (
+                bad_string,
+                replacement,
+                _special_character.search(bad_string).group(0),
+                set(_special_character.findall(replacement)),
+            )
+            for bad_string, replacement in replacements
+        ]
+    return _replacement_rules[key]
+
+
+def _apply_replacements(line, replacements, present):
+    """Apply the rules of a replacement table whose trigger is present."""
+    for bad_string, replacement, trigger, introduced in _get_replacement_rules(
+        replacements
+    ):
+        if trigger in present:
+            line = line.replace(bad_string, replacement)
+            present.update(introduced)
+    return line
+
+
+def replace_undesirable_characters(line, present=None):
     """Replace certain bad characters in a text line.
 
     :param line: (string) the text line in which bad characters are to
                  be replaced.
+    :param present: (set) characters of the line that can start a
+                    replacement, see `_get_special_characters`.
     :return: (string) the text line after the bad characters have been
                       replaced.
     """
-    # These are separate because we want a particular order
-    for bad_string, replacement in UNDESIRABLE_STRING_REPLACEMENTS:
-        line = line.replace(bad_string, replacement)
+    if present is None:
+        present = _get_special_characters(line)
 
-    for bad_char, replacement in iteritems(UNDESIRABLE_CHAR_REPLACEMENTS):
-        line = line.replace(bad_char, replacement)
+    # These are separate because we want a particular order
+    line = _apply_replacements(line, UNDESIRABLE_STRING_REPLACEMENTS, present)
+    line = _apply_replacements(line, UNDESIRABLE_CHAR_REPLACEMENTS, present)
 
     return line
 
 
-def _replace_greek_characters(line):
+def _replace_greek_characters(line, present=None):
     """Replace greek characters in a string."""
-    for greek_char, replacement in iteritems(_GREEK_REPLACEMENTS):
-        try:
-            line = line.replace(greek_char, replacement)
-        except UnicodeDecodeError:
-            logger.exception("Unicode decoding error.")
-            return ""
-    return line
+    if present is None:
+        present = _get_special_characters(line)
+    try:
+        return _apply_replacements(line, _GREEK_REPLACEMENTS, present)
+    except UnicodeDecodeError:
+        logger.exception("Unicode decoding error.")
+        return ""
@@ -31,21 +31,21 @@ The main method from this module is get_regular_expressions.
 from __future__ import print_function
 
 import six
+import marshal
 import os
 import re
 import sys
 import tempfile
+import threading
 import time
 import xml.sax
 from datetime import datetime, timedelta
 
-import rdflib
-import requests
 from six import iteritems, text_type
-from six.moves import cPickle, urllib_error
+from six.moves import urllib_error
 
 from .errors import TaxonomyError
-from .utils import get_clock
+from .utils import get_clock, increment_stat
 
 from .config import (
     CLASSIFIER_WORKDIR,
@@ -69,6 +69,14 @@ _split_by_punctuation = re.compile(r"(\W+)")
 
 _CACHE = {}
 
+# Guards the compilation of the regexes of the keywords.
+_regex_lock = threading.Lock()
+
+# Version of the format of the taxonomy caches. They are marshalled, so
+# that loading them neither needs rdflib nor runs any Python code, and hold
+# the fields of the keywords with the resolved components of composites.
+_CACHE_VERSION = 3
+
 
 def get_cache(taxonomy_id):
     """Return cache for the given taxonomy id.
@@ -305,6 +313,9 @@ class KeywordToken(object):
     simple strings. Specialty of this class is that objects are
     hashable by subject - so in the dictionary two objects with the
     same subject appears as one -- :see: self.__hash__ and self.__cmp__.
+
+    The regexes of the keyword are kept as patterns, and compiled when
+    they are first used.
     """
 
     def __init__(self, subject, store=None, namespace=None, type="HEP"):
@@ -502,11 +513,30 @@ class KeywordToken(object):
         """
         return self.__hash
 
+    @property
+    def regex(self):
+        """Return the compiled regexes, compiling them on first access."""
+        regex = self._regex
+        if regex is None:
+            with _regex_lock:
+                regex = self._regex
+                if regex is None:
+                    regex = [re.compile(pattern) for pattern in self.patterns]
+                    increment_stat("keyword_regex_compiles", len(regex))
+                    self._regex = regex
+        return regex
+
+    @regex.setter
+    def regex(self, value):
+        """Set the regexes from compiled regexes."""
+        self.patterns = [regex.pattern for regex in value]
+        self._regex = list(value)
+
     def __getstate__(self):
         """Get state."""
         state = self.__dict__
         return {
-            "regex": [regex.pattern for regex in state["regex"]],
+            "regex": list(state["patterns"]),
             "compositeof": [text_type(s) for s in state["compositeof"]],
             "fieldcodes": state["fieldcodes"],
             "concept": state["concept"],
@@ -516,14 +546,59 @@ class KeywordToken(object):
             "type": state["type"],
             "nostandalone": state["nostandalone"],
             "_composite": state["_composite"],
-            "id": state["id"],
+            "id": text_type(state["id"]),
         }
 
     def __setstate__(self, state):
         """Get state."""
-        state["regex"] = [re.compile(regex) for regex in state["regex"]]
+        state["patterns"] = state.pop("regex")
+        state["_regex"] = None
         self.__dict__.update(state)
 
+    def to_cache(self):
+        """Return the fields of the keyword as texts, booleans and lists.
+
+        The components of composite keywords are given by their short ids,
+        so this is called once they were resolved by refreshCompositeOf.
+        """
+        return (
+            text_type(self.id),
+            text_type(self.short_id),
+            self.type,
+            text_type(self.concept),
+            list(self.patterns),
+            self.nostandalone,
+            self.spires and text_type(self.spires),
+            [text_type(fieldcode) for fieldcode in self.fieldcodes],
+            self.core,
+            self._composite,
+            [text_type(component.short_id) for component in self.compositeof],
+        )
+
+    @classmethod
+    def from_cache(cls, fields):
+        """Return a keyword from fields returned by :see: to_cache().
+
+        The components of composite keywords are left as short ids.
+        """
+        keyword = cls.__new__(cls)
+        (
+            keyword.id,
+            keyword.short_id,
+            keyword.type,
+            keyword.concept,
+            keyword.patterns,
+            keyword.nostandalone,
+            keyword.spires,
+            keyword.fieldcodes,
+            keyword.core,
+            keyword._composite,
+            keyword.compositeof,
+        ) = fields
+        keyword._regex = None
+        keyword.__hash = hash(keyword.short_id)
+        return keyword
+
     def __cmp__(self, other):
         """Compare objects using _hash."""
         if self.__hash < other.__hash__():
@@ -559,8 +634,10 @@ def _build_cache(source_file, skip_cache=False):
 
     :param source_file: source file of the taxonomy, RDF file
     :param skip_cache: if True, build cache will not be
-        saved (pickled) - it is saved as <source_file.db>
+        saved (marshalled) - it is saved as <source_file.db>
     """
+    import rdflib
+
     store = rdflib.ConjunctiveGraph()
 
     if skip_cache:
@@ -637,11 +714,13 @@ def _build_cache(source_file, skip_cache=False):
                 single_keywords[kt.short_id] = kt
                 single_count += 1
 
-    cached_data = {}
-    cached_data["single"] = single_keywords
-    cached_data["composite"] = composite_keywords
-    cached_data["creation_time"] = time.gmtime()
-    cached_data["version_info"] = {"rdflib": rdflib.__version__}
+    # now when the whole taxonomy was parsed,
+    # find sub-components of the composite kws
+    for kt in composite_keywords.values():
+        kt.refreshCompositeOf(
+            single_keywords, composite_keywords, store=store, namespace=namespace
+        )
+
     logger.debug(
         "Building taxonomy... %d terms built in %.1f sec."
         % (len(single_keywords) + len(composite_keywords), get_clock() - timer_start)
@@ -667,7 +746,9 @@ def _build_cache(source_file, skip_cache=False):
                     logger.error(msg)
                 else:
                     logger.debug("Writing cache to file %s" % cache_path)
-                    cPickle.dump(cached_data, filestream, 1)
+                    marshal.dump(
+                        _cache_data(single_keywords, composite_keywords), filestream
+                    )
                 if filestream:
                     filestream.close()
 
@@ -683,16 +764,6 @@ def _build_cache(source_file, skip_cache=False):
                 " (and could not be created): %s" % cache_dir
             )
 
-    # now when the whole taxonomy was parsed,
-    # find sub-components of the composite kws
-    # it is important to keep this call after the taxonomy was saved,
-    # because we don't  want to pickle regexes multiple times
-    # (as they are must be re-compiled at load time)
-    for kt in composite_keywords.values():
-        kt.refreshCompositeOf(
-            single_keywords, composite_keywords, store=store, namespace=namespace
-        )
-
     # house-cleaning
     if store:
         store.close()
@@ -700,6 +771,35 @@ def _build_cache(source_file, skip_cache=False):
     return (single_keywords, composite_keywords)
 
 
+def _cache_version():
+    """Return the version of the caches, which marshal ties to Python."""
+    return [_CACHE_VERSION, sys.version_info[0]]
+
+
+def _cache_data(single_keywords, composite_keywords):
+    """Return the content of the cache of a taxonomy."""
+    return {
+        "version": _cache_version(),
+        "creation_time": tuple(time.gmtime()),
+        "single": [kw.to_cache() for kw in single_keywords.values()],
+        "composite": [kw.to_cache() for kw in composite_keywords.values()],
+    }
+
+
+def _keywords_from_cache(cached_data):
+    """Return the single and composite keywords of the cache of a taxonomy."""
+    single_keywords = {}
+    for fields in cached_data["single"]:
+        kw = KeywordToken.from_cache(fields)
+        single_keywords[kw.short_id] = kw
+    composite_keywords = {}
+    for fields in cached_data["composite"]:
+        kw = KeywordToken.from_cache(fields)
+        kw.compositeof = [single_keywords[short_id] for short_id in kw.compositeof]
+        composite_keywords[kw.short_id] = kw
+    return single_keywords, composite_keywords
+
+
 def _capitalize_first_letter(word):
     """Return a regex pattern with the first letter.
 
@@ -776,11 +876,11 @@ def _convert_word(word):
 
 
 def _get_cache(cache_file, source_file=None):
-    """Get cached taxonomy using the cPickle module.
+    """Get cached taxonomy using the marshal module.
 
     No check is done at that stage.
 
-    :param cache_file: full path to the file holding pickled data
+    :param cache_file: full path to the file holding marshalled data
     :param source_file: if we discover the cache is obsolete, we
         will build a new cache, therefore we need the source path
         of the cache
@@ -790,17 +890,11 @@ def _get_cache(cache_file, source_file=None):
 
     filestream = open(cache_file, "rb")
     try:
-        cached_data = cPickle.load(filestream)
-        version_info = cached_data["version_info"]
-        if version_info["rdflib"] != rdflib.__version__:
+        cached_data = marshal.loads(filestream.read())
+        if cached_data["version"] != _cache_version():
             raise KeyError
-    except (
-        cPickle.UnpicklingError,
-        ImportError,
-        AttributeError,
-        DeprecationWarning,
-        EOFError,
-    ):
+        single_keywords, composite_keywords = _keywords_from_cache(cached_data)
+    except (ValueError, TypeError, EOFError):
         logger.warning(
             "The existing cache in %s is not readable. "
             "Removing and rebuilding it." % cache_file
@@ -818,21 +912,13 @@ def _get_cache(cache_file, source_file=None):
         if source_file and os.path.exists(source_file):
             return _build_cache(source_file)
         else:
-            logger.error(
+            raise TaxonomyError(
                 "The cache contains obsolete data (and it was deleted), "
                 "however I can't build a new cache, the source does not "
                 "exist or is inaccessible! - %s" % source_file
             )
     filestream.close()
 
-    single_keywords = cached_data["single"]
-    composite_keywords = cached_data["composite"]
-
-    # the cache contains only keys of the composite keywords, not the objects
-    # so now let's resolve them into objects
-    for kw in composite_keywords.values():
-        kw.refreshCompositeOf(single_keywords, composite_keywords)
-
     logger.debug(
         "Retrieved taxonomy from cache %s created on %s"
         % (cache_file, time.asctime(cached_data["creation_time"]))
@@ -864,6 +950,8 @@ def _get_cache_path(source_file):
 
 def _get_last_modification_date(url):
     """Get the last modification date of the ontology."""
+    import requests
+
     request = requests.head(url)
     date_string = request.headers["last-modified"]
     parsed = time.strptime(date_string, "%a, %d %b %Y %H:%M:%S %Z")
@@ -872,6 +960,8 @@ def _get_last_modification_date(url):
 
 def _download_ontology(url, local_file):
     """Download the ontology and stores it in CLASSIFIER_WORKDIR."""
+    import requests
+
     logger.debug("Copying remote ontology '%s' to file '%s'." % (url, local_file))
     try:
         request = requests.get(url, stream=True)
@@ -951,6 +1041,8 @@ def check_taxonomy(taxonomy):
 
     Outputs a list of errors and warnings.
     """
+    import rdflib
+
     logger.info("Building graph with Python RDFLib version %s" % rdflib.__version__)
 
     store = rdflib.ConjunctiveGraph()
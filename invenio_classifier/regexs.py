@@ -28,6 +28,18 @@ from datetime import datetime
 import six
 from six import iteritems
 
+from .utils import LazyPattern
+
+
+def _lazy_compile(pattern, flags=0):
+    """Return a pattern compiled when it is first used.
+
+    Most patterns of this module are only used for reference extraction
+    and are never needed by the classifier.
+    """
+    return LazyPattern(pattern, flags)
+
+
 # Sep
 re_sep = r"\s*[,\s:-]\s*"
 # Sep or no sep
@@ -87,14 +99,14 @@ re_opts = re.VERBOSE | re.UNICODE | re.IGNORECASE
 
 def compute_pos_patterns(patterns):
     """Compute pos patterns."""
-    return [re.compile(p, re_opts) for p in patterns]
+    return [_lazy_compile(p, re_opts) for p in patterns]
 
 
 re_pos = compute_pos_patterns(re_pos_patterns)
 
 # Pattern for arxiv numbers
 # arxiv 9910-1234v9 [physics.ins-det]
-re_arxiv = re.compile(
+re_arxiv = _lazy_compile(
     r"""
     ARXIV[\s:-]*(?P<year>\d{2})-?(?P<month>\d{2})
     [\s.-]*(?P<num>\d{4})(?!\d)(?:[\s-]*V(?P<version>\d))?
@@ -102,7 +114,7 @@ re_arxiv = re.compile(
     re.VERBOSE | re.UNICODE | re.IGNORECASE,
 )
 
-re_arxiv_5digits = re.compile(
+re_arxiv_5digits = _lazy_compile(
     r"""
     ARXIV[\s:-]*(?P<year>(1[3-9]|[2-8][0-9]))-?(?P<month>(0[1-9]|1[0-2]))
     [\s.-]*(?P<num>\d{5})(?!\d)(?:[\s-]*V(?P<version>\d))?
@@ -112,7 +124,7 @@ re_arxiv_5digits = re.compile(
 
 # Pattern for arxiv numbers catchup
 # arxiv:9910-123 [physics.ins-det]
-RE_ARXIV_CATCHUP = re.compile(
+RE_ARXIV_CATCHUP = _lazy_compile(
     r"""
     ARXIV[\s:-]*(?P<year>\d{2})-?(?P<month>\d{2})
     [\s.-]*(?P<num>\d{3})
@@ -121,10 +133,10 @@ RE_ARXIV_CATCHUP = re.compile(
 )
 
 # Patterns for ATLAS CONF report numbers
-RE_ATLAS_CONF_PRE_2010 = re.compile(
+RE_ATLAS_CONF_PRE_2010 = _lazy_compile(
     r"(?<!\w:)ATL(AS)?-CONF-(?P<code>(?:200\d|99)-\d{3})(?![\w\d])"
 )
-RE_ATLAS_CONF_POST_2010 = re.compile(
+RE_ATLAS_CONF_POST_2010 = _lazy_compile(
     r"(?<!\w:)ATL(AS)?-CONF-(?P<code>20[1-9]\d-\d{3})(?![\w\d])"
 )
 
@@ -251,7 +263,7 @@ def compute_arxiv_re(report_pattern, report_number):
     """Compute arXiv report-number."""
     if report_number is None:
         report_number = r"\g<name>"
-    report_re = re.compile(
+    report_re = _lazy_compile(
         r"(?<!<cds\.REPORTNUMBER>)(?<!\w)"
         + "(?P<name>"
         + report_pattern
@@ -282,7 +294,7 @@ def compute_months():
 
 arxiv_months = compute_months()
 
-re_new_arxiv = re.compile(
+re_new_arxiv = _lazy_compile(
     r""" # 9910.1234v9 [physics.ins-det]
     (?<!ARXIV:)(?<!\d)
     (?P<year>%(arxiv_years)s)
@@ -293,7 +305,7 @@ re_new_arxiv = re.compile(
     re.VERBOSE | re.UNICODE | re.IGNORECASE,
 )
 
-re_new_arxiv_5digits = re.compile(
+re_new_arxiv_5digits = _lazy_compile(
     r""" # 9910.1234v9 [physics.ins-det]
     (?<!ARXIV:)(?<!\d)
     (?P<year>%(arxiv_years)s)
@@ -305,10 +317,10 @@ re_new_arxiv_5digits = re.compile(
 )
 
 # Pattern to recognize quoted text:
-re_quoted = re.compile(r'"(?P<title>[^"]+)"', re.UNICODE)
+re_quoted = _lazy_compile(r'"(?P<title>[^"]+)"', re.UNICODE)
 
 # Pattern to recognise an ISBN for a book:
-re_isbn = re.compile(
+re_isbn = _lazy_compile(
     r"""
     (?:ISBN[-– ]*(?:|10|13)|International Standard Book Number)
     [:\s]*
@@ -317,13 +329,13 @@ re_isbn = re.compile(
 )
 
 # Pattern to recognise a correct knowledge base line:
-re_kb_line = re.compile(
+re_kb_line = _lazy_compile(
     r"^\s*(?P<seek>[^\s].*)\s*---\s*(?P<repl>[^\s].*)\s*$", re.UNICODE
 )
 
 # precompile some often-used regexp for speed reasons:
-re_regexp_character_class = re.compile(r"\[[^\]]+\]", re.UNICODE)
-re_multiple_hyphens = re.compile(r"-{2,}", re.UNICODE)
+re_regexp_character_class = _lazy_compile(r"\[[^\]]+\]", re.UNICODE)
+re_multiple_hyphens = _lazy_compile(r"-{2,}", re.UNICODE)
 
 
 # In certain papers, " bf " appears just before the volume of a
@@ -336,19 +348,19 @@ re_multiple_hyphens = re.compile(r"-{2,}", re.UNICODE)
 # and/or numeration and thus breaks the citation.
 # The pattern below is used to identify this situation and remove the
 # " bf" component:
-re_identify_bf_before_vol = re.compile(r" bf ((\w )?: \<cds\.VOL\>)", re.UNICODE)
+re_identify_bf_before_vol = _lazy_compile(r" bf ((\w )?: \<cds\.VOL\>)", re.UNICODE)
 
 # Patterns used for creating institutional preprint report-number
 # recognition patterns (used by function "institute_num_pattern_to_regex"):
 # Recognise any character that isn't a->z, A->Z, 0->9, /, [, ], ' ', '"':
-re_report_num_chars_to_escape = re.compile(r'([^\]A-Za-z0-9\/\[ "])', re.UNICODE)
+re_report_num_chars_to_escape = _lazy_compile(r'([^\]A-Za-z0-9\/\[ "])', re.UNICODE)
 # Replace "hello" with hello:
 re_extract_quoted_text = (
-    re.compile(r'\"([^"]+)\"', re.UNICODE),
+    _lazy_compile(r'\"([^"]+)\"', re.UNICODE),
     r"\g<1>",
 )
 # Replace / [abcd ]/ with /( [abcd])?/ :
-re_extract_char_class = (re.compile(r" \[([^\]]+) \]", re.UNICODE), r"( [\g<1>])?")
+re_extract_char_class = (_lazy_compile(r" \[([^\]]+) \]", re.UNICODE), r"( [\g<1>])?")
 
 
 # URL recognition:
@@ -357,13 +369,13 @@ raw_url_pattern = r"""
         (?:/[\w\d_.?=&%~∼-]+)*/?
 """
 # Stand-alone URL (e.g. http://inveniosoftware.org/ )
-re_raw_url = re.compile(
+re_raw_url = _lazy_compile(
     "['\"]?(?P<url>" + raw_url_pattern + ")['\"]?", re.UNICODE | re.I | re.VERBOSE
 )
 
 # HTML marked-up URL (e.g. <a href="http://inveniosoftware.org/">
 # CERN Document Server Software Consortium</a> )
-re_html_tagged_url = re.compile(
+re_html_tagged_url = _lazy_compile(
     r"""
     # Opening a tag
     <a\s+
@@ -389,7 +401,7 @@ vol_tag = r"<cds\.VOL\>(?P<vol>[^<]+)<\/cds\.VOL>"
 year_tag = r"\<cds\.YR\>\((?P<yr>[^<]+)\)\<\/cds\.YR\>"
 series_tag = r"(?P<series>(?:[A-H]|I{1,3}V?|VI{0,3}))?"
 page_tag = r"\<cds\.PG\>(?P<pg>[^<]+)\<\/cds\.PG\>"
-re_recognised_numeration_for_title_plus_series = re.compile(
+re_recognised_numeration_for_title_plus_series = _lazy_compile(
     r"^\s*[\.,]?\s*(?:Ser\.\s*)?"
     + series_tag
     + r"\s*:?\s*"
@@ -407,7 +419,7 @@ re_recognised_numeration_for_title_plus_series = re.compile(
 # <cds.JOURNAL>J. Phys. A</cds.JOURNAL> : <cds.VOL>31</cds.VOL>
 # <cds.YR>(1998)</cds.YR> <cds.PG>2391</cds.PG>; : <cds.VOL>32</cds.VOL>
 # <cds.YR>(1999)</cds.YR> <cds.PG>6119</cds.PG>.
-re_numeration_no_ibid_txt = re.compile(
+re_numeration_no_ibid_txt = _lazy_compile(
     r"""
           ^((\s*;\s*|\s+and\s+)(?P<series>(?:[A-H]|I{1,3}V?|VI{0,3}))?\s*:?\s
           \<cds\.VOL\>(?P<vol>\d+|(?:\d+\-\d+))\<\/cds\.VOL>\s
@@ -421,22 +433,22 @@ re_numeration_no_ibid_txt = re.compile(
 # year
 # page
 
-re_title_followed_by_series_markup_tags = re.compile(
+re_title_followed_by_series_markup_tags = _lazy_compile(
     r"(\<cds.JOURNAL(?P<ibid>ibid)?\>([^\<]+)\<\/cds.JOURNAL(?:ibid)?\>\s*.?\s*\<cds\.SER\>([A-H]|(I{1,3}V?|VI{0,3}))\<\/cds\.SER\>)",
     re.UNICODE,
 )  # noqa
 
-re_title_followed_by_implied_series = re.compile(
+re_title_followed_by_implied_series = _lazy_compile(
     r"(\<cds.JOURNAL(?P<ibid>ibid)?\>([^\<]+)\<\/cds.JOURNAL(?:ibid)?\>\s*.?\s*([A-H]|(I{1,3}V?|VI{0,3}))\s+:)",
     re.UNICODE,
 )  # noqa
 
 
-re_punctuation = re.compile(r"[\.\,\;\'\(\)\-]", re.UNICODE)
+re_punctuation = _lazy_compile(r"[\.\,\;\'\(\)\-]", re.UNICODE)
 
 # The following pattern is used to recognise "citation items" that have been
 # identified in the line, when building a MARC XML representation of the line:
-re_tagged_citation = re.compile(
+re_tagged_citation = _lazy_compile(
     r"""
           \<cds\.                ## open tag: <cds.
           ((?:JOURNAL(?P<ibid>ibid)?)  ## a JOURNAL tag
@@ -461,20 +473,20 @@ re_tagged_citation = re.compile(
 
 # is there pre-recognised numeration-tagging within a
 # few characters of the start if this part of the line?
-re_tagged_numeration_near_line_start = re.compile(
+re_tagged_numeration_near_line_start = _lazy_compile(
     r"^.{0,4}?<CDS (VOL|SER)>", re.UNICODE
 )
 
-re_ibid = re.compile(r"(-|\b)?IBID(EM)?\.?", re.UNICODE)
+re_ibid = _lazy_compile(r"(-|\b)?IBID(EM)?\.?", re.UNICODE)
 
-re_series_from_numeration = re.compile(r"^([A-Z])\s*[,\s:-]?\s*\d+", re.UNICODE)
-re_series_from_numeration_after_volume = re.compile(
+re_series_from_numeration = _lazy_compile(r"^([A-Z])\s*[,\s:-]?\s*\d+", re.UNICODE)
+re_series_from_numeration_after_volume = _lazy_compile(
     r"^\d+\s*[,\s:-]?\s*([A-Z])", re.UNICODE
 )
 
 # Obtain the series character from the standardised title text
 # Only used when no series letter is obtained from numeration matching
-re_series_from_title = re.compile(
+re_series_from_title = _lazy_compile(
     r"""
     ([^\s].*)
     (?:[\s\.]+(?:(?P<open_bracket>\()\s*[Ss][Ee][Rr]\.)?
@@ -486,7 +498,7 @@ re_series_from_title = re.compile(
 # Only match the ending bracket if the opening bracket was found
 
 re_wash_volume_tag = (
-    re.compile(r"<cds\.VOL>(\w) (\d+)</cds\.VOL>"),
+    _lazy_compile(r"<cds\.VOL>(\w) (\d+)</cds\.VOL>"),
     r"<cds.VOL>\g<1>\g<2></cds.VOL>",
 )
 
@@ -582,7 +594,7 @@ re_sep_or_after_parentesis = "(?:" + re_sep + "|" + re_look_behind_parentesis +
 # numeration with the aid of the recognised titles. The following 2 patterns
 # are used for this:
 
-re_correct_numeration_2nd_try_ptn1 = re.compile(
+re_correct_numeration_2nd_try_ptn1 = _lazy_compile(
     re_year
     + re_sep  # Year
     + re_title_tag  # Recognised, tagged title
@@ -595,7 +607,7 @@ re_correct_numeration_2nd_try_ptn1 = re.compile(
     re.UNICODE | re.VERBOSE,
 )
 
-re_correct_numeration_2nd_try_ptn2 = re.compile(
+re_correct_numeration_2nd_try_ptn2 = _lazy_compile(
     re_year
     + re_sep
     + re_title_tag
@@ -610,7 +622,7 @@ re_correct_numeration_2nd_try_ptn2 = re.compile(
     re.UNICODE | re.VERBOSE,
 )
 
-re_correct_numeration_2nd_try_ptn3 = re.compile(
+re_correct_numeration_2nd_try_ptn3 = _lazy_compile(
     re_title_tag
     + "(?P<aftertitle>"
     + re_sep  # Recognised, tagged title
@@ -622,7 +634,7 @@ re_correct_numeration_2nd_try_ptn3 = re.compile(
 )
 
 
-re_correct_numeration_2nd_try_ptn4 = re.compile(
+re_correct_numeration_2nd_try_ptn4 = _lazy_compile(
     re_title_tag
     + "(?P<aftertitle>"
     + re_sep  # Recognised, tagged title
@@ -642,7 +654,7 @@ re_correct_numeration_2nd_try_ptn4 = re.compile(
 # Delete the colon and expressions such as Serie, vol, V. inside the pattern
 # <serie : volume> E.g. Replace the string """Series A, Vol 4""" with """A 4"""
 re_strip_series_and_volume_labels = (
-    re.compile(
+    _lazy_compile(
         r"(Serie\s|\bS\.?\s)?([A-H])\s?[:,]\s?(\b[Vv]o?l?\.?|\b[Nn]o\.?)?\s?(\d+)",  # noqa
         re.UNICODE,
     ),
@@ -661,7 +673,7 @@ re_nucphysb_subtitle_opt = "(?:" + re_sep + re_nucphysb_subtitle + ")?"
 # Pattern 1: <vol, page, year>
 
 # <v, p, y>
-re_numeration_vol_page_yr = re.compile(
+re_numeration_vol_page_yr = _lazy_compile(
     re_start
     + re_volume
     + re_volume_sub_number_opt
@@ -673,7 +685,7 @@ re_numeration_vol_page_yr = re.compile(
 )
 
 # <v, [FS], p, y>
-re_numeration_vol_nucphys_page_yr = re.compile(
+re_numeration_vol_nucphys_page_yr = _lazy_compile(
     re_start
     + re_volume
     + re_volume_sub_number_opt
@@ -687,7 +699,7 @@ re_numeration_vol_nucphys_page_yr = re.compile(
 )
 
 # <[FS], v, p, y>
-re_numeration_nucphys_vol_page_yr = re.compile(
+re_numeration_nucphys_vol_page_yr = _lazy_compile(
     re_start
     + re_nucphysb_subtitle
     + re_sep
@@ -702,7 +714,7 @@ re_numeration_nucphys_vol_page_yr = re.compile(
 # Pattern 2: <vol, year, page>
 
 # <v, y, p>
-re_numeration_vol_yr_page = re.compile(
+re_numeration_vol_yr_page = _lazy_compile(
     re_start
     + re_volume
     + re_sep_or_parentesis
@@ -713,7 +725,7 @@ re_numeration_vol_yr_page = re.compile(
 )
 
 # <v, sv, [FS]?, y, p>
-re_numeration_vol_subvol_nucphys_yr_page = re.compile(
+re_numeration_vol_subvol_nucphys_yr_page = _lazy_compile(
     re_start
     + re_volume
     + re_volume_sub_number_opt
@@ -726,7 +738,7 @@ re_numeration_vol_subvol_nucphys_yr_page = re.compile(
 )
 
 # <v, [FS]?, y, sv, p>
-re_numeration_vol_nucphys_yr_subvol_page = re.compile(
+re_numeration_vol_nucphys_yr_subvol_page = _lazy_compile(
     re_start
     + re_volume
     + re_nucphysb_subtitle_opt
@@ -739,7 +751,7 @@ re_numeration_vol_nucphys_yr_subvol_page = re.compile(
 )
 
 # <[FS]?, v, y, p>
-re_numeration_nucphys_vol_yr_page = re.compile(
+re_numeration_nucphys_vol_yr_page = _lazy_compile(
     re_start
     + re_nucphysb_subtitle
     + re_sep
@@ -756,7 +768,7 @@ re_numeration_nucphys_vol_yr_page = re.compile(
 # Pattern 3: <vol, serie, year, page>
 
 # <v, s, [FS]?, y, p>
-# re_numeration_vol_series_nucphys_yr_page = (re.compile(
+# re_numeration_vol_series_nucphys_yr_page = (_lazy_compile(
 #   re_volume + re_sep +
 #   re_series + re_sep +
 #   _sre_non_compiled_pattern_nucphysb_subtitle + re_sep_or_parentesis +
@@ -767,7 +779,7 @@ re_numeration_nucphys_vol_yr_page = re.compile(
 #                                       r'<cds.PG>\g<page></cds.PG> ')
 
 # <v, [FS]?, s, y, p
-re_numeration_vol_nucphys_series_yr_page = re.compile(
+re_numeration_vol_nucphys_series_yr_page = _lazy_compile(
     re_start
     + re_volume
     + re_nucphysb_subtitle_opt
@@ -782,7 +794,7 @@ re_numeration_vol_nucphys_series_yr_page = re.compile(
 
 # Pattern 4: <vol, serie, page, year>
 # <v, s, [FS]?, p, y>
-re_numeration_vol_series_nucphys_page_yr = re.compile(
+re_numeration_vol_series_nucphys_page_yr = _lazy_compile(
     re_start
     + re_volume
     + re_sep
@@ -796,7 +808,7 @@ re_numeration_vol_series_nucphys_page_yr = re.compile(
 )
 
 # <v, [FS]?, s, p, y>
-re_numeration_vol_nucphys_series_page_yr = re.compile(
+re_numeration_vol_nucphys_series_page_yr = _lazy_compile(
     re_start
     + re_volume
     + re_nucphysb_subtitle_opt
@@ -810,7 +822,7 @@ re_numeration_vol_nucphys_series_page_yr = re.compile(
 )
 
 # Pattern 5: <year, vol, page>
-re_numeration_yr_vol_page = re.compile(
+re_numeration_yr_vol_page = _lazy_compile(
     re_start + re_year + re_sep_or_after_parentesis + re_volume + re_sep + re_page,
     re.UNICODE | re.VERBOSE,
 )
@@ -818,7 +830,7 @@ re_numeration_yr_vol_page = re.compile(
 
 # Pattern used to locate references of a doi inside a citation
 # This pattern matches both url (http) and 'doi:' or 'DOI' formats
-re_doi = re.compile(
+re_doi = _lazy_compile(
     r"""
     ((\(?[Dd][Oo][Ii](\s)*\)?:?(\s)*)       # noqa 'doi:' or 'doi' or '(doi)' (upper or lower case)
     |(https?://dx\.doi\.org\/))?            # or 'http://dx.doi.org/'    (neither has to be present)
@@ -848,42 +860,92 @@ def _create_regex_pattern_add_optional_spaces_to_word_characters(word):
     return new_word
 
 
+_REFERENCE_SECTION_TITLES = [
+    "references",
+    "references.",
+    "r\u00c9f\u00e9rences",
+    "r\u00c9f\u00c9rences",
+    "reference",
+    "refs",
+    "r\u00e9f\u00e9rence",
+    "r\u00c9f\u00c9rence",
+    "r\xb4ef\xb4erences",
+    "r\u00e9fs",
+    "r\u00c9fs",
+    "bibliography",
+    "bibliographie",
+    "citations",
+    "literaturverzeichnis",
+]
+
+# Characters that re.I matches besides the upper and lower case.
+_EXTRA_CASE_VARIANTS = {"i": "\u0130\u0131"}
+
+
+def _create_case_insensitive_regex_pattern(word):
+    r"""Return a pattern matching the word in any case, with optional spaces.
+
+    The cases of each character are spelled out, which is several times
+    faster than re.I when searching through a whole document.
+
+    :param word: (string) the word to be inserted into a regex pattern.
+    :return: (string) the regex pattern for that word with optional spaces
+                      (\s*) between all of its characters.
+    """
+    new_word = ""
+    for ch in word:
+        variants = set([ch, ch.lower(), ch.upper()])
+        variants.update(_EXTRA_CASE_VARIANTS.get(ch.lower(), ""))
+        variants = sorted(variant for variant in variants if len(variant) == 1)
+        if len(variants) == 1:
+            new_word += re.escape(variants[0]) + r"\s*"
+        else:
+            new_word += "[%s]\\s*" % "".join(variants)
+    return new_word
+
+
+# What may precede a reference section title on its line: a section
+# number such as "7." or "[VII]", or a bare number.
+_SECTION_TITLE_MARKERS = (
+    r"^\s*([\[\-\{\(])?\s*"
+    r"((\w|\d){1,5}([\.\-\,](\w|\d){1,5})?\s*"
+    r"[\.\-\}\)\]]\s*)?",
+    r"^(\d){1,3}\s*",
+)
+
+# Every line matching a title pattern starts like this: matching it first
+# skips most lines cheaply.
+re_reference_section_title_start = re.compile(
+    "(?:%s)(?:%s)"
+    % (
+        "|".join(_SECTION_TITLE_MARKERS),
+        "|".join(
+            sorted(
+                set(
+                    _create_case_insensitive_regex_pattern(t[:3])
+                    for t in _REFERENCE_SECTION_TITLES
+                )
+            )
+        ),
+    ),
+    re.UNICODE,
+)
+
+
 def get_reference_section_title_patterns():
     """Return a list of compiled regex patterns used to search for the title.
 
     :return: (list) of compiled regex patterns.
     """
     patterns = []
-    titles = [
-        "references",
-        "references.",
-        "r\u00c9f\u00e9rences",
-        "r\u00c9f\u00c9rences",
-        "reference",
-        "refs",
-        "r\u00e9f\u00e9rence",
-        "r\u00c9f\u00c9rence",
-        "r\xb4ef\xb4erences",
-        "r\u00e9fs",
-        "r\u00c9fs",
-        "bibliography",
-        "bibliographie",
-        "citations",
-        "literaturverzeichnis",
-    ]
-    sect_marker = six.text_type(
-        r"^\s*([\[\-\{\(])?\s*"
-        r"((\w|\d){1,5}([\.\-\,](\w|\d){1,5})?\s*"
-        r"[\.\-\}\)\]]\s*)?"
-        r"(?P<title>",
-    )
-    sect_marker1 = six.text_type(r"^(\d){1,3}\s*(?P<title>")
+    sect_marker = six.text_type(_SECTION_TITLE_MARKERS[0] + r"(?P<title>")
+    sect_marker1 = six.text_type(_SECTION_TITLE_MARKERS[1] + r"(?P<title>")
     line_end = (
         r"(\s*s\s*e\s*c\s*t\s*i\s*o\s*n\s*)?)([\)\}\]])?"
         r"($|\s*[\[\{\(\<]\s*[1a-z]\s*[\}\)\>\]]|\:$)"
     )
 
-    for t in titles:
+    for t in _REFERENCE_SECTION_TITLES:
         t_ptn = re.compile(
             sect_marker
             + _create_regex_pattern_add_optional_spaces_to_word_characters(t)
@@ -1107,6 +1169,103 @@ def get_post_reference_section_keyword_patterns():
     return compiled_patterns
 
 
+_re_group_name = re.compile(r"\(\?P([<=])(\w+)")
+
+
+class CombinedPattern(object):
+    """A list of compiled regex patterns merged into one alternation.
+
+    Matching a line tries the patterns in order, like `regex_match_list`,
+    but in a single call. The groups of every pattern are renamed so that
+    they can live in the same regex; the returned match objects map the
+    group names and numbers, and ``re``, back to the pattern that matched.
+    The patterns must not use numbered backreferences.
+    """
+
+    def __init__(self, patterns):
+        """Merge a list of compiled patterns sharing the same flags."""
+        self.patterns = list(patterns)
+        branches = []
+        for index, pattern in enumerate(self.patterns):
+            branches.append(
+                "(?P<_%d>%s)"
+                % (
+                    index,
+                    _re_group_name.sub(
+                        lambda m: "(?P%s%s_%d" % (m.group(1), m.group(2), index),
+                        pattern.pattern,
+                    ),
+                )
+            )
+        flags = self.patterns[0].flags if self.patterns else 0
+        self.regex = re.compile("|".join(branches), flags)
+        self._branch_groups = [
+            self.regex.groupindex["_%d" % index] for index in range(len(branches))
+        ]
+
+    def match(self, line):
+        """Return a `CombinedMatch` of the first matching pattern or None."""
+        m = self.regex.match(line)
+        if m is None:
+            return None
+        index = int(m.lastgroup[1:])
+        return CombinedMatch(m, self.patterns[index], index, self._branch_groups[index])
+
+
+class CombinedMatch(object):
+    """Match object of one of the patterns of a `CombinedPattern`."""
+
+    def __init__(self, match, pattern, index, offset):
+        """Wrap the match of the alternation."""
+        self.match = match
+        self.re = pattern
+        self.index = index
+        self.offset = offset
+
+    def _get_group(self, group):
+        """Return the group of the alternation matching a group of re."""
+        if group == 0:
+            return self.offset
+        if isinstance(group, int):
+            if group > self.re.groups:
+                raise IndexError("no such group")
+            return self.offset + group
+        if group not in self.re.groupindex:
+            raise IndexError("no such group")
+        return "%s_%d" % (group, self.index)
+
+    def group(self, group=0):
+        """Return a group, by name or number, of the pattern that matched."""
+        return self.match.group(self._get_group(group))
+
+    def start(self, group=0):
+        """Return the start of a group."""
+        return self.match.start(self._get_group(group))
+
+    def end(self, group=0):
+        """Return the end of a group."""
+        return self.match.end(self._get_group(group))
+
+    def span(self, group=0):
+        """Return the span of a group."""
+        return self.match.span(self._get_group(group))
+
+
+def combine_patterns(patterns):
+    """Return the patterns merged into a `CombinedPattern` if possible.
+
+    Patterns compiled with different flags cannot share a regex and are
+    returned unchanged, as are those exceeding the number of groups the
+    regex engine supports (100 on Python 2).
+    """
+    if len(set(pattern.flags for pattern in patterns)) != 1:
+        return patterns
+    try:
+        return CombinedPattern(patterns)
+    except (AssertionError, re.error):
+        return patterns
+
+
 def regex_match_list(line, patterns):
     """Given a list of COMPILED regex patters, match them all.
 
@@ -1115,10 +1274,12 @@ def regex_match_list(line, patterns):
 
     :param line: (unicode string) to be searched in.
     :param patterns: (list) of compiled regex patterns to search  "line"
-        with.
+        with, or a `CombinedPattern`.
     :return: (None or an re.match object), depending upon whether one of
              the patterns matched within line or not.
     """
+    if isinstance(patterns, CombinedPattern):
+        return patterns.match(line)
     m = None
     for ptn in patterns:
         m = ptn.match(line)
@@ -1128,7 +1289,7 @@ def regex_match_list(line, patterns):
 
 
 # The different forms of arXiv notation
-re_arxiv_notation = re.compile(
+re_arxiv_notation = _lazy_compile(
     r"""
     (arxiv)|(e[\-\s]?print:?\s*arxiv)
     """,
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Classifier cache of the text extracted from files.
+
+Entries are keyed by the SHA-256 of the content of a file and the options
+of the extraction, so a file is only converted again when it changes. They
+are written atomically, so that concurrent writers do not corrupt them,
+and the least recently used entries are removed when the cache grows over
+``CLASSIFIER_TEXT_CACHE_SIZE`` bytes. The directory is only scanned when
+its size, estimated from the entries stored since the last scan, is over
+that limit, or every hundred stores, to count the entries written by other
+processes; the temporary files left by writers which died are removed then.
+The cache is only used when ``CLASSIFIER_TEXT_CACHE`` is set.
+"""
+
+from __future__ import unicode_literals
+
+import hashlib
+import logging
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from .config import CACHE_PATH, CLASSIFIER_TEXT_CACHE, CLASSIFIER_TEXT_CACHE_SIZE
+from .utils import increment_stat
+
+logger = logging.getLogger(__name__)
+
+# Changing it makes the entries of previous versions unreachable. Entries
+# are marshalled, so the Python major version is part of the keys too.
+_FORMAT = "2"
+_SUFFIX = ".text"
+_TEMPORARY_SUFFIX = ".tmp"
+# Seconds after which a temporary file is taken as left by a writer which
+# died, and removed.
+_TEMPORARY_GRACE = 3600
+_HASH_CHUNK_SIZE = 1 << 20
+# Number of stores after which the directory is scanned again.
+_SCAN_INTERVAL = 100
+
+# Estimated size of the cache, or None until its directory was scanned, and
+# number of stores since the last scan.
+_estimated_size = None
+_stores_since_scan = 0
+_size_lock = threading.Lock()
+
+
+def _get_cache_dir():
+    """Return the directory of the cache, creating it if needed."""
+    cache_dir = os.path.join(CACHE_PATH, "classifier", "text")
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            # Created by a concurrent writer.
+            if not os.path.isdir(cache_dir):
+                raise
+    return cache_dir
+
+
+def get_key(fpath, *options):
+    """Return the cache key of the text extracted from a file.
+
+    :param fpath: (string) path to the file
+    :param options: the options of the extraction, as texts or numbers
+    :return: (string) the key, or None if the cache is disabled or the file
+        cannot be read.
+    """
+    if not CLASSIFIER_TEXT_CACHE:
+        return None
+    digest = hashlib.sha256()
+    try:
+        with open(fpath, "rb") as filestream:
+            for chunk in iter(lambda: filestream.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except (IOError, OSError):
+        return None
+    for option in (_FORMAT, sys.version_info[0]) + options:
+        digest.update(("\0%s" % (option,)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load(key):
+    """Return the value cached for a key, or None if there is none."""
+    path = os.path.join(_get_cache_dir(), key + _SUFFIX)
+    try:
+        with open(path, "rb") as filestream:
+            value = marshal.loads(zlib.decompress(filestream.read()))
+    except (IOError, OSError):
+        increment_stat("text_cache_misses")
+        return None
+    except (EOFError, ValueError, TypeError, zlib.error):
+        logger.warning("The text cache entry %s is not readable." % path)
+        increment_stat("text_cache_misses")
+        return None
+    try:
+        # Mark the entry as recently used.
+        os.utime(path, None)
+    except OSError:
+        pass
+    increment_stat("text_cache_hits")
+    return value
+
+
+def store(key, value):
+    """Cache a value made of lists, texts and numbers for a key."""
+    cache_dir = _get_cache_dir()
+    data = zlib.compress(marshal.dumps(value))
+    descriptor, temporary_path = tempfile.mkstemp(
+        dir=cache_dir, suffix=_TEMPORARY_SUFFIX
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as filestream:
+            filestream.write(data)
+        os.rename(temporary_path, os.path.join(cache_dir, key + _SUFFIX))
+    except (IOError, OSError):
+        logger.exception("Unable to write the text cache entry %s." % key)
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        return
+    if _needs_scan(len(data)):
+        evict(CLASSIFIER_TEXT_CACHE_SIZE)
+
+
+def _needs_scan(size):
+    """Return whether to scan the cache after storing an entry of a size.
+
+    The size is added to the estimated size of the cache.
+    """
+    global _estimated_size, _stores_since_scan
+    with _size_lock:
+        _stores_since_scan += 1
+        if _estimated_size is None:
+            return True
+        _estimated_size += size
+        return (
+            _estimated_size > CLASSIFIER_TEXT_CACHE_SIZE
+            or _stores_since_scan >= _SCAN_INTERVAL
+        )
+
+
+def evict(size):
+    """Remove the least recently used entries until the cache fits a size.
+
+    Temporary files older than an hour, left by writers which died, are
+    removed as well; the others count in the size of the cache.
+    """
+    global _estimated_size, _stores_since_scan
+    cache_dir = _get_cache_dir()
+    entries = []
+    total = 0
+    stale = time.time() - _TEMPORARY_GRACE
+    for name in os.listdir(cache_dir):
+        if not name.endswith((_SUFFIX, _TEMPORARY_SUFFIX)):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            status = os.stat(path)
+            if name.endswith(_TEMPORARY_SUFFIX) and status.st_mtime < stale:
+                os.remove(path)
+                increment_stat("text_cache_stale_files")
+                continue
+        except OSError:
+            # Renamed or removed by a concurrent writer.
+            continue
+        total += status.st_size
+        if name.endswith(_SUFFIX):
+            entries.append((status.st_mtime, status.st_size, path))
+    for _, entry_size, path in sorted(entries):
+        if total <= size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            # Removed by a concurrent writer.
+            pass
+        total -= entry_size
+        increment_stat("text_cache_evictions")
+    with _size_lock:
+        _estimated_size = total
+        _stores_since_scan = 0
@@ -22,7 +22,31 @@
 import re
 import sys
 import six
+import threading
 import time
+from collections import Counter
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+class LazyPattern(object):
+    """A regular expression compiled the first time it is used.
+
+    Patterns which most runs never use are not compiled when their module
+    is imported.
+    """
+
+    def __init__(self, pattern, flags=0):
+        """Remember the arguments of ``re.compile``."""
+        self._arguments = (pattern, flags)
+        self._compiled = None
+
+    def __getattr__(self, name):
+        """Return an attribute of the compiled pattern."""
+        if self._compiled is None:
+            self._compiled = re.compile(*self._arguments)
+        return getattr(self._compiled, name)
 
 
 def encode_for_xml(text, wash=False, xml_version="1.0", quote=False):
@@ -42,20 +66,20 @@ def encode_for_xml(text, wash=False, xml_version="1.0", quote=False):
 
 try:
     six.unichr(0x100000)
-    RE_ALLOWED_XML_1_0_CHARS = re.compile(
+    RE_ALLOWED_XML_1_0_CHARS = LazyPattern(
         "[^\U00000009\U0000000a\U0000000d\U00000020-"
         "\U0000d7ff\U0000e000-\U0000fffd\U00010000-\U0010ffff]"
     )
-    RE_ALLOWED_XML_1_1_CHARS = re.compile(
+    RE_ALLOWED_XML_1_1_CHARS = LazyPattern(
         "[^\U00000001-\U0000d7ff\U0000e000-\U0000fffd\U00010000-\U0010ffff]"
     )
 except ValueError:
     # oops, we are running on a narrow UTF/UCS Python build,
     # so we have to limit the UTF/UCS char range:
-    RE_ALLOWED_XML_1_0_CHARS = re.compile(
+    RE_ALLOWED_XML_1_0_CHARS = LazyPattern(
         "[^\U00000009\U0000000a\U0000000d\U00000020-" "\U0000d7ff\U0000e000-\U0000fffd]"
     )
-    RE_ALLOWED_XML_1_1_CHARS = re.compile(
+    RE_ALLOWED_XML_1_1_CHARS = LazyPattern(
         "[^\U00000001-\U0000d7ff\U0000e000-\U0000fffd]"
     )
 
@@ -87,3 +111,74 @@ def get_clock():
     if sys.version_info < (3, 3):
         return time.clock()
     return time.perf_counter()
+
+
+def increment_stat(name, count=1):
+    """Add to the named counter of the classifier statistics."""
+    with _stats_lock:
+        _stats[name] += count
+
+
+def get_stats():
+    """Return a copy of the classifier statistics counters."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    """Reset all the classifier statistics counters."""
+    with _stats_lock:
+        _stats.clear()
+
+
+# Marks the end of the items of a prefetched iterable.
+_END = object()
+
+
+def prefetch(iterable, count=1):
+    """Iterate over an iterable while a thread computes the next items.
+
+    Up to ``count`` items are computed ahead of the one being used.
+    Exceptions raised by the iterable are raised again by the iteration.
+    """
+    items = six.moves.queue.Queue(count)
+    stop = threading.Event()
+
+    def put(item):
+        """Put an item in the queue, unless the iteration was left."""
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except six.moves.queue.Full:
+                pass
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    break
+            else:
+                put((_END, None))
+        except Exception:
+            put((_END, sys.exc_info()))
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            item, exc_info = items.get()
+            if exc_info is not None:
+                six.reraise(*exc_info)
+            if item is _END:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
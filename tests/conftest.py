@@ -28,9 +28,12 @@
 from __future__ import absolute_import, print_function
 
 import os
+import sys
 
 import pytest
 
+from invenio_classifier import extractor
+
 
 @pytest.fixture
 def demo_taxonomy():
@@ -89,3 +92,37 @@ higher-curvature terms allow a derivation of the moduli space metric.
 This leads us to discuss higher-derivative corrections to the M5-brane
 action.
 """
+
+
+FAKE_PDFINFO = """#!%s
+print("Title:          Gauge field theory")
+print("Pages:          7")
+"""
+
+# Writes every page the way pdftotext does, ending with a page-break.
+FAKE_PDFTOTEXT = """#!%s
+import sys
+arguments = sys.argv[1:]
+first = int(arguments[arguments.index("-f") + 1]) if "-f" in arguments else 1
+last = int(arguments[arguments.index("-l") + 1]) if "-l" in arguments else 7
+if arguments[-2:] == ["-", "-"]:
+    # Read the document from the standard input.
+    if not getattr(sys.stdin, "buffer", sys.stdin).read().startswith(b"%%PDF"):
+        sys.exit(1)
+for page in range(first, last + 1):
+    sys.stdout.write("Page %%d of gauge field theory\\nYang-Mills\\n\\f" %% page)
+"""
+
+
+@pytest.fixture
+def fake_poppler(monkeypatch, tmpdir):
+    """Replace pdfinfo and pdftotext with scripts for a document of 7 pages."""
+    for name, script in (("pdfinfo", FAKE_PDFINFO), ("pdftotext", FAKE_PDFTOTEXT)):
+        executable = tmpdir.join(name)
+        executable.write(script % sys.executable)
+        executable.chmod(0o755)
+        monkeypatch.setattr(
+            extractor, "CLASSIFIER_PATH_" + name.upper(), str(executable)
+        )
+    monkeypatch.setenv("PATH", str(tmpdir) + os.pathsep + os.environ["PATH"])
+    return str(tmpdir.join("pdftotext"))
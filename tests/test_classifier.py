@@ -25,6 +25,7 @@ import os
 import shutil
 import stat
 import time
+import zipfile
 
 try:
     from unittest.mock import patch
@@ -32,7 +33,12 @@ except ImportError:
     from mock import patch
 import pytest
 
-from invenio_classifier import get_keywords_from_local_file, get_keywords_from_text
+from invenio_classifier import (
+    get_keywords_from_bytes,
+    get_keywords_from_local_file,
+    get_keywords_from_text,
+)
+from invenio_classifier.api import output_keywords_for_sources
 from invenio_classifier.errors import TaxonomyError
 
 
@@ -53,6 +59,134 @@ def test_keywords(demo_taxonomy, demo_text):
     assert {"keyword": "supersymmetry", "number": 1} in core_keywords
 
 
+def test_partial_match_converts_pages(fake_poppler, demo_pdf_file, demo_taxonomy):
+    """Test that partial matching only converts the pages it searches."""
+    output = {}
+    for match_mode in ("full", "partial"):
+        out = get_keywords_from_local_file(
+            demo_pdf_file,
+            taxonomy_name=demo_taxonomy,
+            output_mode="dict",
+            match_mode=match_mode,
+        )
+        output[match_mode] = out["complete_output"]["single_keywords"]
+
+    # All 7 pages, then pages 1 to 5.
+    assert output["full"] == [{"keyword": "gauge field theory Yang-Mills", "number": 7}]
+    assert output["partial"] == [
+        {"keyword": "gauge field theory Yang-Mills", "number": 5}
+    ]
+
+
+def test_keywords_from_bytes(fake_poppler, demo_pdf_file, demo_taxonomy, demo_text):
+    """Test keyword extraction from the content of PDF and text files."""
+    with open(demo_pdf_file, "rb") as filestream:
+        out = get_keywords_from_bytes(
+            filestream.read(), taxonomy_name=demo_taxonomy, output_mode="dict"
+        )
+    assert out["complete_output"]["single_keywords"] == [
+        {"keyword": "gauge field theory Yang-Mills", "number": 7}
+    ]
+
+    out = get_keywords_from_bytes(
+        demo_text.encode("utf-8"), taxonomy_name=demo_taxonomy, output_mode="dict"
+    )
+    assert {"keyword": "aberration", "number": 2} in out["complete_output"][
+        "single_keywords"
+    ]
+    with pytest.raises(TypeError):
+        get_keywords_from_bytes(b"", demo_taxonomy, output_mod="dict")
+
+
+def test_keywords_for_archive_sources(demo_taxonomy, tmpdir):
+    """Test that every file of an archive is a source."""
+    archive = tmpdir.join("papers.zip")
+    with zipfile.ZipFile(str(archive), "w") as zipped:
+        zipped.writestr("first.txt", b"Gauge field theory\n")
+        zipped.writestr("second.txt", b"Yang-Mills\n")
+    tmpdir.join("third.txt").write("Supersymmetry\n")
+
+    with patch("invenio_classifier.api.get_keywords_from_text") as get_keywords:
+        output_keywords_for_sources([str(tmpdir)], demo_taxonomy, output_mode="dict")
+    assert sorted(list(call[0][0]) for call in get_keywords.call_args_list) == [
+        ["Gauge field theory\n"],
+        ["Supersymmetry\n"],
+        ["Yang-Mills\n"],
+    ]
+
+
+def test_keywords_for_corrupt_archive_sources(demo_taxonomy, tmpdir):
+    """Test that an archive which cannot be read only stops itself."""
+    import io
+    import random
+    import tarfile
+
+    rand = random.Random(0)
+    content = "".join(rand.choice("abcdefghij \n") for _ in range(100000))
+    content = content.encode("utf-8")
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name in ("first.txt", "second.txt"):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    # Truncated in the second member.
+    tmpdir.join("papers.tar.gz").write(buffer.getvalue()[:80000], "wb")
+    tmpdir.join("papers.zip").write(b"PK\x03\x04 not a zip file", "wb")
+    tmpdir.join("third.txt").write("Supersymmetry\n")
+
+    with patch("invenio_classifier.api.get_keywords_from_text") as get_keywords:
+        output_keywords_for_sources([str(tmpdir)], demo_taxonomy, output_mode="dict")
+    assert sorted(len(call[0][0]) > 1 for call in get_keywords.call_args_list) == [
+        False,
+        True,
+    ]
+    assert ["Supersymmetry\n"] in [
+        list(call[0][0]) for call in get_keywords.call_args_list
+    ]
+
+
+@pytest.mark.parametrize(
+    "script, limits",
+    [
+        ("import time\ntime.sleep(30)", {"timeout": 0.2}),
+        ("import os, signal\nos.kill(os.getpid(), signal.SIGXCPU)", {"cpu_limit": 60}),
+        (
+            "import os, signal\nos.kill(os.getpid(), signal.SIGABRT)",
+            {"memory_limit": 1 << 30},
+        ),
+    ],
+)
+def test_keywords_for_sources_with_failed_conversions(
+    demo_taxonomy, monkeypatch, tmpdir, script, limits
+):
+    """Test that a conversion which times out or exceeds a limit is skipped."""
+    import sys
+
+    from invenio_classifier import extractor
+
+    pdftotext = tmpdir.mkdir("bin").join("pdftotext")
+    pdftotext.write("#!%s\n%s\n" % (sys.executable, script))
+    pdftotext.chmod(0o755)
+    monkeypatch.setattr(extractor, "CLASSIFIER_PATH_PDFTOTEXT", str(pdftotext))
+    monkeypatch.setattr(
+        extractor, "conversion_service", extractor.ConversionService(1, **limits)
+    )
+    sources = tmpdir.mkdir("sources")
+    sources.join("first.pdf").write(b"%PDF-1.4\n", "wb")
+    with zipfile.ZipFile(str(sources.join("papers.zip")), "w") as archive:
+        archive.writestr("second.pdf", b"%PDF-1.4\n")
+        archive.writestr("third.txt", b"Supersymmetry\n")
+    sources.join("fourth.txt").write("Yang-Mills\n")
+
+    with patch("invenio_classifier.api.get_keywords_from_text") as get_keywords:
+        output_keywords_for_sources([str(sources)], demo_taxonomy, output_mode="dict")
+    assert sorted(list(call[0][0]) for call in get_keywords.call_args_list) == [
+        ["Supersymmetry\n"],
+        ["Yang-Mills\n"],
+    ]
+
+
 def test_taxonomy_error(demo_text):
     """Test passing non existing taxonomy."""
     with pytest.raises(TaxonomyError):
@@ -177,6 +311,82 @@ def test_rebuild_cache(demo_taxonomy):
     assert len(rex[0]) + len(rex[1]) == 63
 
 
+def test_cache_format(demo_taxonomy):
+    """Test that keywords loaded from the cache are the keywords built."""
+    from six.moves import cPickle
+
+    from invenio_classifier.reader import (
+        _get_cache,
+        _get_cache_path,
+        _get_ontology,
+        get_regular_expressions,
+    )
+
+    def fields(keywords):
+        return {
+            short_id: (
+                kw.concept,
+                [regex.pattern for regex in kw.regex],
+                kw.nostandalone,
+                kw.spires,
+                kw.fieldcodes,
+                kw.core,
+                kw.isComposite(),
+                [component.short_id for component in kw.compositeof],
+            )
+            for short_id, kw in keywords.items()
+        }
+
+    built = get_regular_expressions(demo_taxonomy, rebuild=True)
+    cache = _get_cache_path(_get_ontology(demo_taxonomy)[0])
+    loaded = _get_cache(cache, demo_taxonomy)
+    assert fields(loaded[0]) == fields(built[0])
+    assert fields(loaded[1]) == fields(built[1])
+    assert any(kw.compositeof for kw in loaded[1].values())
+
+    # Caches in the previous pickled format are rebuilt.
+    with open(cache, "wb") as filestream:
+        cPickle.dump({"single": {}, "composite": {}}, filestream, 1)
+    assert fields(_get_cache(cache, demo_taxonomy)[1]) == fields(built[1])
+
+
+def test_lazy_regex(demo_taxonomy):
+    """Test that the regexes of keywords are compiled once, when used."""
+    import threading
+
+    from six.moves import cPickle
+
+    from invenio_classifier.reader import (
+        _get_cache,
+        _get_cache_path,
+        _get_ontology,
+        get_regular_expressions,
+    )
+    from invenio_classifier.utils import get_stats, reset_stats
+
+    get_regular_expressions(demo_taxonomy, rebuild=True)
+    cache = _get_cache_path(_get_ontology(demo_taxonomy)[0])
+    reset_stats()
+    single_keywords = _get_cache(cache, demo_taxonomy)[0]
+    assert "keyword_regex_compiles" not in get_stats()
+
+    keyword = next(kw for kw in single_keywords.values() if kw.patterns)
+    threads = [threading.Thread(target=lambda: keyword.regex) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [regex.pattern for regex in keyword.regex] == keyword.patterns
+    assert get_stats()["keyword_regex_compiles"] == len(keyword.patterns)
+
+    # Pickled keywords are not compiled either.
+    patterns = keyword.patterns
+    keyword = cPickle.loads(cPickle.dumps(keyword))
+    assert get_stats()["keyword_regex_compiles"] == len(patterns)
+    assert [regex.pattern for regex in keyword.regex] == patterns
+    assert get_stats()["keyword_regex_compiles"] == 2 * len(keyword.patterns)
+
+
 @pytest.mark.xfail
 def test_cache_accessibility(demo_taxonomy):
     """Test taxonomy cache accessibility/writability."""
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for the document buffer."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import pytest
+
+from invenio_classifier import document as document_module
+from invenio_classifier.document import DocumentBuffer
+from invenio_classifier.normalizer import cut_references
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "\n", "one", "one\n", "one\r\ntwo\fthree\r\rfour ", "\n\none\n\n"],
+)
+def test_lines(text):
+    """Test that the lines are split like str.splitlines."""
+    document = DocumentBuffer(text)
+
+    assert list(document) == text.splitlines()
+    assert len(document) == len(text.splitlines())
+    assert document.fulltext() == "\n".join(text.splitlines())
+
+
+def test_views():
+    """Test that views behave like the corresponding lists."""
+    lines = ["zero\n", "one", "", "three", "four", "five"]
+    document = DocumentBuffer.from_lines(lines)
+
+    view = document.without(1, 3)[1:]
+    assert list(view) == ["three", "four", "five"]
+    assert view[0] == "three" and view[-1] == "five"
+    assert view.line_number(0) == 3
+    assert view.text is document.text
+
+    view = document.filter(lambda line: "e" in line).without(2, 3)
+    assert list(view) == ["zero\n", "one", "five"]
+    assert view.fulltext() == "zero\n\none\nfive"
+    assert view[::2] == ["zero\n", "five"]
+    with pytest.raises(IndexError):
+        view[3]
+
+
+@pytest.mark.parametrize("count", [0, 2, 3, 7])
+def test_from_iterable(monkeypatch, count):
+    """Test that lines read from an iterable are joined in groups."""
+    monkeypatch.setattr(document_module, "_JOIN_GROUP_SIZE", 3)
+    lines = ["line %d\n" % number if number % 2 else "" for number in range(count)]
+    document = DocumentBuffer.from_lines(iter(lines))
+
+    assert list(document) == lines
+    assert document.text == DocumentBuffer.from_lines(lines).text
+
+
+def test_cut_references_in_document():
+    """Test that cutting a document returns a view without references."""
+    lines = ["Introduction"] * 10 + ["References", "[1] A. Author", "[2] B. Author"]
+    document = DocumentBuffer.from_lines(lines)
+
+    cut = cut_references(document)
+    assert list(cut) == cut_references(list(lines))
+    assert list(document) == lines
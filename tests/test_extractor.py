@@ -0,0 +1,517 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for the text extraction."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import codecs
+import gzip
+import io
+import re
+import signal
+import subprocess
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+
+import pytest
+
+from invenio_classifier import extractor
+from invenio_classifier.document import DocumentBuffer
+from invenio_classifier.errors import ConversionLimitExceeded, ConversionTimeout
+from invenio_classifier.extractor import (
+    ConversionQuality,
+    ConversionService,
+    convert_PDF_to_plaintext,
+    document_from_local_file,
+    document_from_stream,
+    get_archive_type,
+    get_page_ranges,
+    get_percentage_page_ranges,
+    get_plaintext_document_body,
+    is_pdf,
+    iter_PDF_to_plaintext,
+    iter_archive_documents,
+    iter_text_file_lines,
+    iter_pdftotext_lines,
+    partial_document_from_local_file,
+    pdftotext_conversion_is_bad,
+    sniff_file_type,
+)
+from invenio_classifier.utils import get_stats, reset_stats
+
+
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        (b"%PDF-1.5\n%\x8f\n", True),
+        (b"\x00" * 1000 + b"%PDF-1.4\n", True),
+        (b"\x00" * 1024 + b"%PDF-1.4\n", False),
+        (b"We study the %PDF format.", False),
+        (b"We study gauge field theory.\n", False),
+        (b"", False),
+    ],
+)
+def test_is_pdf(tmpdir, content, expected):
+    """Test that PDF files are recognised by their header."""
+    document = tmpdir.join("document")
+    document.write_binary(content)
+
+    assert is_pdf(str(document)) is expected
+
+
+def test_is_pdf_on_files(demo_pdf_file, tmpdir):
+    """Test recognising the demo PDF, and a missing file."""
+    assert is_pdf(demo_pdf_file)
+    assert not is_pdf(str(tmpdir.join("missing.pdf")))
+
+
+@pytest.mark.parametrize(
+    "sample,expected",
+    [
+        (b"%PDF-1.5\n%\x8f\n", "pdf"),
+        (b"%!PS-Adobe-3.0\n", "postscript"),
+        # The binary EPS files of DOS are not text.
+        (b"\xc5\xd0\xd3\xc6\x1e\x00", None),
+        (b"\x1f\x8b\x08\x00", "gzip"),
+        ("Gauge field theory\f\n".encode("utf-8"), "text"),
+        ("Schr\u00f6dinger equation\n".encode("utf-8"), "text"),
+        ("Schr\u00f6dinger equation\n".encode("latin-1"), "text"),
+        (b"\x00" * 257 + b"ustar\x0000" + b"%PDF-1.5\n", "tar"),
+        (b"PK\x03\x04\x14\x00%PDF-1.5\n", "zip"),
+        (b"\x7fELF\x02\x01\x01\x00", None),
+        (b"", None),
+    ],
+)
+def test_sniff_file_type(sample, expected):
+    """Test recognising the type of a file from its first bytes."""
+    assert sniff_file_type(sample) == expected
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "latin-1"])
+def test_plaintext_document_body(tmpdir, encoding):
+    """Test reading the lines of a text file."""
+    document = tmpdir.join("document.txt")
+    document.write_binary("Schr\u00f6dinger\fequation\nAbstract\n".encode(encoding))
+
+    assert get_plaintext_document_body(str(document)) == (
+        ["Schr\u00f6dinger\fequation\n", "Abstract\n"],
+        0,
+    )
+    document.write_binary(b"\x7fELF\x02\x01\x01\x00")
+    assert get_plaintext_document_body(str(document)) == ([], 1)
+
+
+def test_postscript_document_body(tmpdir):
+    """Test that PostScript files are read as text files."""
+    document = tmpdir.join("document.ps")
+    document.write_binary(b"%!PS-Adobe-3.0\n(Gauge field theory) show\n")
+
+    assert get_plaintext_document_body(str(document)) == (
+        ["%!PS-Adobe-3.0\n", "(Gauge field theory) show\n"],
+        0,
+    )
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 1 << 22])
+def test_iter_text_file_lines(monkeypatch, tmpdir, block_size):
+    """Test that text files are split like codecs and io.StringIO split them."""
+    monkeypatch.setattr(extractor, "_TEXT_BLOCK_SIZE", block_size)
+    text = "Schr\u00f6dinger\r\nequation\fAbstract\r\u2028\n\nGauge \u2014 theory"
+    document = tmpdir.join("document.txt")
+    document.write_binary(text.encode("utf-8") + b"\xff")
+
+    with codecs.open(str(document), encoding="utf-8", errors="replace") as filestream:
+        assert list(iter_text_file_lines(str(document), errors="replace")) == list(
+            filestream
+        )
+    assert (
+        list(iter_text_file_lines(str(document), "latin-1", universal_newlines=False))
+        == io.StringIO(document.read_binary().decode("latin-1")).readlines()
+    )
+    with pytest.raises(UnicodeDecodeError):
+        list(iter_text_file_lines(str(document)))
+    document.write_binary(b"")
+    assert list(iter_text_file_lines(str(document))) == []
+
+
+def test_conversion_timeout():
+    """Test that conversions running for too long are killed."""
+    reset_stats()
+    service = ConversionService(1, timeout=0.2)
+
+    with service.process([sys.executable, "-c", "print('text')"]) as process:
+        assert process.stdout.read().strip() == b"text"
+    with pytest.raises(ConversionTimeout):
+        with service.process(
+            [sys.executable, "-c", "import time; time.sleep(30)"]
+        ) as process:
+            process.stdout.read()
+    assert get_stats()["conversions"] == 2
+    assert get_stats()["conversion_timeouts"] == 1
+    assert service.metrics() == {"queued": 0, "running": 0}
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="needs Linux resource limits"
+)
+def test_conversion_limits():
+    """Test that conversions are stopped by their memory and CPU limits."""
+    reset_stats()
+    service = ConversionService(1, memory_limit=256 * 1024 * 1024, cpu_limit=1)
+
+    with service.process(
+        [
+            sys.executable,
+            "-c",
+            "import resource; print(resource.getrlimit(resource.RLIMIT_CPU))",
+        ]
+    ) as process:
+        assert process.stdout.read().strip() == b"(1, 2)"
+    with pytest.raises(ConversionLimitExceeded):
+        # Abort when out of memory, as pdftotext does.
+        with service.process(
+            [
+                sys.executable,
+                "-c",
+                "import os\ntry:\n    b'x' * (1 << 30)\nexcept MemoryError:\n"
+                "    os.abort()",
+            ]
+        ) as process:
+            process.stdout.read()
+    with pytest.raises(ConversionLimitExceeded):
+        with service.process([sys.executable, "-c", "while True: pass"]) as process:
+            process.stdout.read()
+    with pytest.raises(ConversionLimitExceeded):
+        # Killed at the hard limit.
+        with service.process(
+            [
+                sys.executable,
+                "-c",
+                "import signal\nsignal.signal(signal.SIGXCPU, signal.SIG_IGN)\n"
+                "while True: pass",
+            ]
+        ) as process:
+            process.stdout.read()
+    # Killed by something else than the limit.
+    with service.process(
+        [
+            sys.executable,
+            "-c",
+            "import os, signal; os.kill(os.getpid(), signal.SIGKILL)",
+        ]
+    ) as process:
+        process.stdout.read()
+    assert process.returncode == -signal.SIGKILL
+    assert get_stats()["conversion_memory_limits"] == 1
+    assert get_stats()["conversion_cpu_limits"] == 2
+    assert service.metrics() == {"queued": 0, "running": 0}
+
+
+def test_conversion_input_errors():
+    """Test that the errors of the input of a conversion are raised."""
+
+    def chunks():
+        yield b"Gauge field theory\n"
+        raise ValueError("the input was cut")
+
+    service = ConversionService(1)
+    with pytest.raises(ValueError):
+        with service.process(
+            [sys.executable, "-c", "import sys; sys.stdin.read()"], stdin=chunks()
+        ) as process:
+            process.stdout.read()
+    assert service.metrics() == {"queued": 0, "running": 0}
+
+
+def test_conversion_concurrency():
+    """Test that no more conversions than allowed run at the same time."""
+    service = ConversionService(2)
+    running = []
+
+    def convert():
+        with service.process(
+            [sys.executable, "-c", "import time; time.sleep(0.2)"]
+        ) as process:
+            running.append(service.metrics()["running"])
+            process.stdout.read()
+
+    threads = [threading.Thread(target=convert) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(running) == 5
+    assert max(running) == 2
+
+
+def test_executable_exists(monkeypatch, tmpdir):
+    """Test that looking for an executable is only done once per PATH."""
+    tmpdir.join("pdftotext").write("")
+    monkeypatch.setenv("PATH", str(tmpdir))
+    assert extractor.executable_exists("pdftotext")
+
+    tmpdir.join("pdftotext").remove()
+    assert extractor.executable_exists("pdftotext")
+    monkeypatch.setenv("PATH", str(tmpdir) + ":")
+    assert not extractor.executable_exists("pdftotext")
+
+
+def test_page_ranges():
+    """Test splitting a document into page ranges."""
+    assert get_page_ranges(7, 3) == [(1, 3), (4, 6), (7, 7)]
+    assert get_page_ranges(6, 3) == [(1, 3), (4, 6)]
+    assert get_page_ranges(2, 3) == [(1, 2)]
+    assert get_page_ranges(None, 3) == []
+
+
+def test_convert_page_ranges(fake_poppler, demo_pdf_file):
+    """Test that converting page ranges gives the lines of one conversion."""
+    reset_stats()
+    doclines, status = convert_PDF_to_plaintext(demo_pdf_file)
+    assert get_stats()["conversions"] == 1
+
+    assert convert_PDF_to_plaintext(demo_pdf_file, pages_per_job=3) == (
+        doclines,
+        status,
+    )
+    # pdfinfo, then three page ranges.
+    assert get_stats()["conversions"] == 5
+    assert doclines[:4] == [
+        "Page 1 of gauge field theory\n",
+        "Yang-Mills\n",
+        "\f",
+        "Page 2 of gauge field theory",
+    ]
+    assert len(doclines) == 7 * 3
+
+
+def test_streamed_conversion(fake_poppler, demo_pdf_file):
+    """Test that streamed lines are those of a whole conversion."""
+    assert (
+        list(iter_PDF_to_plaintext(demo_pdf_file))
+        == (convert_PDF_to_plaintext(demo_pdf_file)[0])
+    )
+
+    output = subprocess.check_output([fake_poppler, demo_pdf_file])
+    document = document_from_local_file(demo_pdf_file)
+    expected = DocumentBuffer(output.decode("utf-8")).filter(extractor._ONE_WORD.search)
+    assert list(document) == list(expected)
+    assert document.fulltext() == expected.fulltext()
+
+
+def test_closed_conversion_is_killed():
+    """Test that closing the lines of a conversion kills it."""
+    start = time.time()
+    lines = iter_pdftotext_lines(
+        [
+            sys.executable,
+            "-c",
+            "import sys, time; print('Page 1'); sys.stdout.flush(); time.sleep(30)",
+        ]
+    )
+
+    assert next(lines).strip() == "Page 1"
+    lines.close()
+    assert time.time() - start < 10
+    assert extractor.conversion_service.metrics()["running"] == 0
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        [],
+        ["Gauge field theory\n", "\f", "  Yang-Mills  \n"],
+        ["a      b\u2003\u2003c\n", " \t \n", "d"],
+        ["x" + " " * 30 + "y\n"] * 10,
+    ],
+)
+def test_conversion_quality(lines):
+    """Test that words and whitespaces are counted like with regexes."""
+    quality = ConversionQuality()
+    for line in lines:
+        quality.add(line)
+
+    assert quality.words == sum(len(re.findall(r"\S+", line.strip())) for line in lines)
+    assert quality.spaces == sum(len(re.findall(r"\s", line.strip())) for line in lines)
+    assert pdftotext_conversion_is_bad(lines) is quality.is_bad()
+
+
+def test_bad_conversion_is_stopped(monkeypatch, tmpdir, demo_pdf_file):
+    """Test that a clearly bad conversion is killed before its end."""
+    executable = tmpdir.join("pdftotext")
+    executable.write(
+        "#!%s\nimport sys\nwhile True:\n    sys.stdout.write('x%sy\\n')\n"
+        % (sys.executable, " " * 30)
+    )
+    executable.chmod(0o755)
+    monkeypatch.setattr(extractor, "CLASSIFIER_PATH_PDFTOTEXT", str(executable))
+    reset_stats()
+
+    assert convert_PDF_to_plaintext(demo_pdf_file, sample=1000) == ([], 2)
+    assert get_stats()["conversions_aborted"] == 1
+    assert get_stats()["bad_conversions"] == 1
+
+
+def test_stopped_conversion_is_closed(monkeypatch, demo_pdf_file):
+    """Test that the lines of pdftotext are closed when a conversion stops."""
+
+    class Lines(object):
+        closed = False
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            return "x" + " " * 30 + "y\n"
+
+        next = __next__
+
+        def close(self):
+            self.closed = True
+
+    lines = Lines()
+    monkeypatch.setattr(extractor, "CLASSIFIER_PATH_PDFTOTEXT", "pdftotext")
+    monkeypatch.setattr(extractor, "iter_pdftotext_lines", lambda arguments: lines)
+
+    assert convert_PDF_to_plaintext(demo_pdf_file, sample=1000) == ([], 2)
+    assert lines.closed
+    lines.closed = False
+    stream = iter_PDF_to_plaintext(demo_pdf_file)
+    next(stream)
+    stream.close()
+    assert lines.closed
+
+
+def test_percentage_page_ranges():
+    """Test finding the pages covering percentages of a document."""
+    percentages = ((0, 20), (40, 60))
+    assert get_percentage_page_ranges(10, percentages) == [(1, 2), (5, 6)]
+    assert get_percentage_page_ranges(7, percentages) == [(1, 5)]
+    assert get_percentage_page_ranges(2, percentages) == [(1, 2)]
+    assert get_percentage_page_ranges(1, percentages) == [(1, 1)]
+    assert get_percentage_page_ranges(10, ((40, 60), (0, 20), (50, 90))) == [
+        (1, 2),
+        (5, 9),
+    ]
+    assert get_percentage_page_ranges(None, percentages) == []
+
+
+def test_partial_document(fake_poppler, demo_pdf_file, tmpdir, monkeypatch):
+    """Test that only the pages of the partial text are converted."""
+    reset_stats()
+    document = partial_document_from_local_file(demo_pdf_file, ((0, 20), (60, 80)))
+
+    # pdfinfo, then pages 1 to 2 and 5 to 6.
+    assert get_stats()["conversions"] == 3
+    assert [line for line in document if line.startswith("Page")] == [
+        "Page %d of gauge field theory" % page for page in (1, 2, 5, 6)
+    ]
+    text = tmpdir.join("document.txt")
+    text.write("Gauge field theory\n")
+    assert partial_document_from_local_file(str(text)) is None
+
+    # A failure to run pdfinfo is logged like the other read errors.
+    monkeypatch.setattr(
+        extractor, "CLASSIFIER_PATH_PDFINFO", str(tmpdir.join("missing"))
+    )
+    assert list(partial_document_from_local_file(demo_pdf_file)) == []
+
+
+def test_document_from_stream(fake_poppler, demo_pdf_file):
+    """Test extracting the lines of PDF and text files read from streams."""
+    reset_stats()
+    with open(demo_pdf_file, "rb") as filestream:
+        document = document_from_stream(filestream)
+    assert get_stats()["conversions"] == 1
+    assert list(document) == list(document_from_local_file(demo_pdf_file))
+
+    text = "Schr\u00f6dinger equation\fGauge field theory\n\n Abstract"
+    document = document_from_stream(io.BytesIO(text.encode("utf-8")))
+    assert list(document) == [
+        "Schr\u00f6dinger equation\f",
+        "Gauge field theory\n",
+        " Abstract",
+    ]
+    assert list(document_from_stream(io.BytesIO(b""))) == []
+
+
+def make_archive(path, members):
+    """Write a tar file, compressed as its name says, or a zip file."""
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, content in members:
+                archive.writestr(name, content)
+        return
+    with tarfile.open(path, "w:gz" if path.endswith(".gz") else "w") as archive:
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+
+
+@pytest.mark.parametrize("name", ["papers.tar", "papers.tar.gz", "papers.zip"])
+def test_archive_documents(fake_poppler, demo_pdf_file, tmpdir, name):
+    """Test reading the PDF and text files of an archive without unpacking it."""
+    with open(demo_pdf_file, "rb") as filestream:
+        pdf = filestream.read()
+    compressed = io.BytesIO()
+    with gzip.GzipFile(fileobj=compressed, mode="wb") as filestream:
+        filestream.write(b"Supersymmetry\n")
+    archive = str(tmpdir.join(name))
+    make_archive(
+        archive,
+        [
+            ("paper.pdf", pdf),
+            ("figure.png", b"\x89PNG\r\n\x1a\n\x00\x00"),
+            ("source/paper.tex.gz", compressed.getvalue()),
+            ("notes.txt", b"Gauge field theory\n\nSchr\xf6dinger\n"),
+        ],
+    )
+
+    assert get_archive_type(archive) == name.split(".")[-1].replace("gz", "tar")
+    assert get_archive_type(demo_pdf_file) is None
+    documents = [
+        (member, list(lines)) for member, lines in iter_archive_documents(archive)
+    ]
+    # The members are read as the local files are.
+    assert documents == [
+        ("paper.pdf", get_plaintext_document_body(demo_pdf_file)[0]),
+        ("source/paper.tex.gz", ["Supersymmetry\n"]),
+        ("notes.txt", ["Gauge field theory\n", "\n", "Schr\u00f6dinger\n"]),
+    ]
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        [("mimetype", b"application/vnd.oasis.opendocument.text")],
+        [("mimetype", b"application/epub+zip"), ("META-INF/container.xml", b"")],
+        [("[Content_Types].xml", b"<Types/>"), ("word/document.xml", b"<w/>")],
+    ],
+)
+def test_zipped_documents_are_not_archives(tmpdir, members):
+    """Test that the members of zipped documents are not read."""
+    document = str(tmpdir.join("document.zip"))
+    make_archive(document, members + [("notes.txt", b"Gauge field theory\n")])
+
+    assert list(iter_archive_documents(document)) == []
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for the fetching of remote documents."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import io
+import threading
+import time
+import zipfile
+from collections import Counter
+
+import pytest
+from six.moves import BaseHTTPServer, socketserver
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from invenio_classifier.api import output_keywords_for_sources
+from invenio_classifier.errors import FetchError
+from invenio_classifier.extractor import (
+    document_from_local_file,
+    get_plaintext_document_body,
+)
+from invenio_classifier.fetcher import Fetcher
+from invenio_classifier.utils import get_stats, reset_stats
+
+
+class _Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server(demo_pdf_file):
+    """Serve documents from a local HTTP server, and count the requests."""
+    with open(demo_pdf_file, "rb") as filestream:
+        pdf = filestream.read()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zipped:
+        zipped.writestr("papers/first.txt", b"Gauge field theory\n")
+        zipped.writestr("papers/second.pdf", pdf)
+    requests = Counter()
+    running = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                requests[self.path] += 1
+                running.append(self.path)
+            try:
+                self.respond()
+            finally:
+                with lock:
+                    running.remove(self.path)
+
+        def respond(self):
+            if self.path == "/paper.pdf":
+                self.send(200, pdf)
+            elif self.path == "/papers.zip":
+                self.send(200, archive.getvalue())
+            elif self.path == "/image.png":
+                self.send(200, b"\x89PNG\r\n\x1a\n\x00")
+            elif self.path == "/notes.txt":
+                self.send(200, b"Gauge field theory\n\nYang-Mills\n")
+            elif self.path == "/flaky.txt" and requests[self.path] < 3:
+                self.send(503, b"")
+            elif self.path == "/flaky.txt":
+                self.send(200, b"Supersymmetry\n")
+            elif self.path == "/large.txt":
+                self.send(200, b"Gauge field theory\n" * 100)
+            elif self.path == "/streamed.txt":
+                # Without a length, the body ends when the connection closes.
+                self.send(200, b"Gauge field theory\n" * 100, length=False)
+            elif self.path.startswith("/slow/"):
+                self.server.running.append(len(running))
+                time.sleep(0.1)
+                self.send(200, self.path.encode("utf-8") + b"\n")
+            else:
+                self.send(404, b"")
+
+        def send(self, status, body, length=True):
+            self.send_response(status)
+            if length:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = _Server(("127.0.0.1", 0), Handler)
+    httpd.requests = requests
+    httpd.running = []
+    httpd.url = "http://127.0.0.1:%d" % httpd.server_address[1]
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch(fake_poppler, demo_pdf_file, server):
+    """Test extracting the text of remote PDF and text files."""
+    fetcher = Fetcher()
+    reset_stats()
+
+    document = fetcher.fetch(server.url + "/paper.pdf")
+    assert list(document) == list(document_from_local_file(demo_pdf_file))
+    document = fetcher.fetch(server.url + "/notes.txt")
+    assert list(document) == ["Gauge field theory\n", "Yang-Mills\n"]
+    assert get_stats()["fetches"] == 2
+    assert get_stats()["conversions"] == 2
+
+
+def test_fetch_retries(server):
+    """Test that unavailable documents are requested again."""
+    fetcher = Fetcher(retries=2, backoff_factor=0)
+
+    assert list(fetcher.fetch(server.url + "/flaky.txt")) == ["Supersymmetry\n"]
+    assert server.requests["/flaky.txt"] == 3
+    with pytest.raises(FetchError):
+        fetcher.fetch(server.url + "/missing.txt")
+
+
+@pytest.mark.parametrize("path", ["/large.txt", "/streamed.txt"])
+def test_fetch_size_limit(server, path):
+    """Test that documents larger than the limit are not read."""
+    reset_stats()
+    with pytest.raises(FetchError):
+        Fetcher(max_size=1000).fetch(server.url + path)
+    assert get_stats()["fetch_errors"] == 1
+    assert get_stats().get("fetched_bytes", 0) <= 1000
+    assert len(Fetcher(max_size=None).fetch(server.url + path)) == 100
+
+
+def test_fetch_all(server):
+    """Test that documents are fetched concurrently and returned in order."""
+    urls = [server.url + "/slow/%d" % number for number in range(8)]
+    urls.insert(3, server.url + "/missing.txt")
+
+    documents = list(Fetcher(concurrency=3).fetch_all(urls))
+    assert [url for url, _, _ in documents] == urls
+    assert documents[3][1:] == (None, None)
+    assert [list(document) for _, _, document in documents if document] == [
+        ["/slow/%d\n" % number] for number in range(8)
+    ]
+    assert 1 < max(server.running) <= 3
+
+
+def test_fetch_documents(fake_poppler, demo_pdf_file, server):
+    """Test extracting the text of the files of remote archives."""
+    fetcher = Fetcher()
+
+    documents = fetcher.fetch_documents(server.url + "/papers.zip")
+    assert [member for member, _ in documents] == [
+        "papers/first.txt",
+        "papers/second.pdf",
+    ]
+    assert list(documents[0][1]) == ["Gauge field theory\n"]
+    assert documents[1][1] == get_plaintext_document_body(demo_pdf_file)[0]
+    documents = fetcher.fetch_documents(server.url + "/notes.txt")
+    assert [(member, list(lines)) for member, lines in documents] == [
+        (None, ["Gauge field theory\n", "\n", "Yang-Mills\n"])
+    ]
+    assert fetcher.fetch_documents(server.url + "/image.png") == [(None, None)]
+
+
+def test_keywords_for_url_sources(
+    fake_poppler, demo_pdf_file, demo_taxonomy, server, tmpdir
+):
+    """Test that URL sources are fetched between the other sources."""
+    tmpdir.join("notes.txt").write("Yang-Mills\n")
+    sources = [
+        server.url + "/flaky.txt",
+        server.url + "/missing.txt",
+        str(tmpdir.join("notes.txt")),
+        server.url + "/notes.txt",
+        server.url + "/papers.zip",
+    ]
+
+    with patch("invenio_classifier.api.get_keywords_from_text") as get_keywords:
+        output_keywords_for_sources(sources, demo_taxonomy, output_mode="dict")
+    assert [list(call[0][0]) for call in get_keywords.call_args_list] == [
+        ["Supersymmetry\n"],
+        ["Yang-Mills\n"],
+        ["Gauge field theory\n", "\n", "Yang-Mills\n"],
+        ["Gauge field theory\n"],
+        get_plaintext_document_body(demo_pdf_file)[0],
+    ]
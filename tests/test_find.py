@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for finding the reference section."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import pytest
+
+from invenio_classifier import find
+from invenio_classifier.normalizer import cut_references
+from invenio_classifier.regexs import (
+    combine_patterns,
+    get_reference_line_numeration_marker_patterns,
+    get_reference_section_title_patterns,
+    re_reference_section_title_start,
+    regex_match_list,
+)
+from invenio_classifier.utils import get_stats, reset_stats
+
+
+@pytest.fixture
+def document():
+    """Return the lines of a document with a reference section."""
+    return (
+        ["Introduction", "We study gauge field theory."] * 20
+        + ["References"]
+        + ["[%d] A. Author, Phys. Rev. D %d (2001) 1." % (n, n) for n in range(1, 6)]
+        + ["Appendix A", "More gauge field theory."]
+    )
+
+
+def test_cut_references(document):
+    """Test cutting the reference section out of a document."""
+    text_lines = cut_references(list(document))
+
+    assert "References" not in text_lines
+    assert not [line for line in text_lines if line.startswith("[")]
+    assert text_lines[-2:] == ["Appendix A", "More gauge field theory."]
+
+
+def test_patterns_are_shared(document):
+    """Test that the pattern lists are only built once."""
+    cut_references(list(document))
+    patterns = find._get_patterns(find.get_reference_section_title_patterns)
+    cut_references(list(document))
+
+    assert find._get_patterns(find.get_reference_section_title_patterns) is patterns
+    assert find._get_title_marker_patterns("References") is (
+        find._get_title_marker_patterns("References")
+    )
+
+
+def test_combined_patterns():
+    """Test that combined patterns match like the list of patterns."""
+    patterns = get_reference_line_numeration_marker_patterns("References")
+    combined = combine_patterns(patterns)
+    lines = ["[1] A. Author", "References 2. B. Author", "(3) C. Author", "Text"]
+
+    for line in lines:
+        expected = regex_match_list(line, patterns)
+        match = regex_match_list(line, combined)
+        if expected is None:
+            assert match is None
+            continue
+        assert match.group() == expected.group()
+        assert match.re is expected.re
+        for group in ("mark", "title", "marknum"):
+            try:
+                value = expected.group(group)
+            except IndexError:
+                with pytest.raises(IndexError):
+                    match.group(group)
+            else:
+                assert match.group(group) == value
+
+
+def test_title_start_covers_titles():
+    """Test that every section title is found by the cheap title search."""
+    patterns = get_reference_section_title_patterns()
+    lines = ["References", "2 R E F S", "[1] Bibliographie:", "LITERATURVERZEICHNIS"]
+
+    for line in lines:
+        assert regex_match_list(line, patterns)
+        assert re_reference_section_title_start.match(line)
+    assert not re_reference_section_title_start.match("We study references.")
+
+
+def test_search_windows():
+    """Test that the search windows cover the document from its end."""
+    assert find._get_search_windows(100, (30, 60, 100)) == [
+        (70, 100),
+        (40, 70),
+        (0, 40),
+    ]
+    assert find._get_search_windows(100, (50,)) == [(50, 100), (0, 50)]
+    assert find._get_search_windows(3, (30, 60, 100)) == [(2, 3), (1, 2), (0, 1)]
+    assert find._get_search_windows(0, (100,)) == []
+
+
+def test_reference_search_widening(document):
+    """Test that the search only widens when nothing was found."""
+    reset_stats()
+    details = find.find_reference_section(document, windows=(30, 100))
+    assert details["start_line"] == 40
+    assert get_stats().get("reference_search_widened", 0) == 0
+
+    # Push the references out of the last 30% of the document.
+    text_lines = document + ["Conclusions"] * 100
+    assert find.find_reference_section(text_lines, windows=(30, 100)) == details
+    assert get_stats()["reference_search_widened"] == 1
+
+
+def test_no_title_search_order():
+    """Test that stronger markers are searched in all the windows first."""
+    text_lines = (
+        ["We study gauge field theory."] * 40
+        + ["[%d] A. Author, Phys. Rev. D %d (2001) 1." % (n, n) for n in range(1, 6)]
+        + ["We study gauge field theory."] * 25
+        + ["%d apples and pears" % n for n in range(1, 6)]
+        + ["We study gauge field theory."] * 25
+    )
+    details = find.get_reference_section_beginning(text_lines)
+    assert details["start_line"] == 40
+    assert details["how_found_start"] == 2
+
+
+def test_end_of_reference_section(document):
+    """Test that section titles followed by more references are skipped."""
+    text_lines = document[:43] + ["Table 1"] + document[43:]
+    start = find.find_reference_section(text_lines)["start_line"]
+
+    end = find.find_end_of_reference_section(
+        text_lines, start, "[1]", find.re_reference_line_bracket_markers.pattern
+    )
+    assert text_lines[end] == "[5] A. Author, Phys. Rev. D 5 (2001) 1."
+
+
+def test_cut_references_in_short_documents():
+    """Test that a lone section title is cut like any reference section."""
+    assert cut_references(["References"]) == []
+    assert cut_references(["Gauge field theory", "[1] A. Author"]) == [
+        "Gauge field theory",
+        "[1] A. Author",
+    ]
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for the cost of importing the package."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import subprocess
+import sys
+
+import pytest
+
+# Many times what the import takes, so that only a regression such as
+# compiling all the patterns at import time goes over it, even on a loaded
+# machine.
+IMPORT_TIME_BUDGET = 1.0
+
+
+def _import_time():
+    """Return the cumulative time of the import, as python -X importtime."""
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", "import invenio_classifier"],
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+    for line in output.splitlines():
+        fields = line[len("import time:") :].split("|")
+        if len(fields) == 3 and fields[2].strip() == "invenio_classifier":
+            return int(fields[1]) / 1e6
+
+
+def _imported_modules():
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import sys\nimport invenio_classifier\nprint('\\n'.join(sys.modules))",
+        ],
+        universal_newlines=True,
+    )
+    return set(output.split())
+
+
+def test_heavy_dependencies_are_not_imported():
+    """Test that rdflib and requests are only imported when needed."""
+    modules = _imported_modules()
+
+    assert "invenio_classifier" in modules
+    assert not [
+        name
+        for name in modules
+        if name.split(".")[0] in ("rdflib", "requests", "urllib3")
+    ]
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="python -X importtime needs Python 3.7"
+)
+def test_import_time_budget():
+    """Test that importing the package stays well within its time budget."""
+    assert min(_import_time() for _ in range(3)) < IMPORT_TIME_BUDGET
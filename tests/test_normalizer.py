@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for the classifier text normalizer."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+from six import iteritems
+
+from invenio_classifier.normalizer import (
+    _GREEK_REPLACEMENTS,
+    UNDESIRABLE_CHAR_REPLACEMENTS,
+    UNDESIRABLE_STRING_REPLACEMENTS,
+    _replace_greek_characters,
+    normalize_fulltext,
+    normalize_stream,
+    replace_undesirable_characters,
+)
+
+
+def test_normalize_stream(demo_text):
+    """Test that streamed normalization equals whole-text normalization."""
+    text_lines = demo_text.splitlines() + [
+        "2-pion decays of the B -meson and the K 0 ",
+        "non abelian SU (3)",
+        "α and β decays – with the J/Psi (3097) ",
+        "",
+        "¨ a ﬁt",
+    ]
+    expected = normalize_fulltext("\n".join(text_lines))
+
+    for chunk_size in (1, 10, 100, 100000):
+        chunks = list(normalize_stream(iter(text_lines), chunk_size=chunk_size))
+        assert "".join(chunks) == expected
+
+    assert len(list(normalize_stream(text_lines, chunk_size=1))) > 1
+
+
+def test_normalize_stream_empty():
+    """Test streamed normalization of an empty document."""
+    assert "".join(normalize_stream([])) == normalize_fulltext("")
+
+
+def test_replacements_only_for_present_characters():
+    """Test that skipping absent characters does not change the output."""
+
+    def replace_all(line):
+        for bad_string, replacement in UNDESIRABLE_STRING_REPLACEMENTS:
+            line = line.replace(bad_string, replacement)
+        for bad_char, replacement in iteritems(UNDESIRABLE_CHAR_REPLACEMENTS):
+            line = line.replace(bad_char, replacement)
+        for greek_char, replacement in iteritems(_GREEK_REPLACEMENTS):
+            line = line.replace(greek_char, replacement)
+        return line
+
+    samples = [
+        "plain ASCII text\fwith a page break\r\n",
+        "`a and \x7f o and \x13 e",
+        " and ".join(UNDESIRABLE_CHAR_REPLACEMENTS),
+        "".join(_GREEK_REPLACEMENTS) + "\u201c quoted\u201d",
+    ]
+    for sample in samples:
+        expected = replace_all(sample)
+        assert _replace_greek_characters(replace_undesirable_characters(sample)) == (
+            expected
+        )
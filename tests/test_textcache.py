@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for the cache of extracted text."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import marshal
+import os
+import zlib
+
+import pytest
+
+from invenio_classifier import textcache
+from invenio_classifier.extractor import (
+    get_plaintext_document_body,
+    text_lines_from_local_file,
+)
+from invenio_classifier.utils import get_stats, reset_stats
+
+
+@pytest.fixture
+def text_cache(monkeypatch, tmpdir):
+    """Enable the text cache in a temporary directory."""
+    monkeypatch.setattr(textcache, "CLASSIFIER_TEXT_CACHE", True)
+    monkeypatch.setattr(textcache, "CACHE_PATH", str(tmpdir.mkdir("cache")))
+    monkeypatch.setattr(textcache, "_estimated_size", None)
+    reset_stats()
+    return tmpdir.join("cache", "classifier", "text")
+
+
+def test_keys(text_cache, tmpdir):
+    """Test that keys depend on the content of files and the options."""
+    first = tmpdir.join("first.txt")
+    first.write("Gauge field theory\n")
+    second = tmpdir.join("second.txt")
+    second.write("Gauge field theory\n")
+
+    key = textcache.get_key(str(first), "plaintext", 0)
+    assert textcache.get_key(str(second), "plaintext", 0) == key
+    assert textcache.get_key(str(first), "plaintext", 1) != key
+    second.write("Yang-Mills\n")
+    assert textcache.get_key(str(second), "plaintext", 0) != key
+    assert textcache.get_key(str(tmpdir.join("missing.txt"))) is None
+
+
+def test_extraction_is_cached(text_cache, tmpdir):
+    """Test that extracting the same content twice reads the cache."""
+    document = tmpdir.join("document.txt")
+    document.write("Gauge field theory\nYang-Mills\n")
+    textbody = get_plaintext_document_body(str(document))
+    lines = text_lines_from_local_file(str(document))
+    assert get_stats() == {"text_cache_misses": 2}
+
+    copy = tmpdir.join("copy.txt")
+    document.copy(copy)
+    assert get_plaintext_document_body(str(copy)) == textbody
+    assert text_lines_from_local_file(str(copy)) == lines
+    assert get_stats()["text_cache_hits"] == 2
+    assert len(text_cache.listdir()) == 2
+
+
+def test_unreadable_entries(text_cache):
+    """Test that corrupted entries are misses."""
+    textcache.store("key", ["Gauge field theory\n"])
+    text_cache.join("key.text").write_binary(b"corrupted")
+
+    assert textcache.load("key") is None
+    assert textcache.load("missing") is None
+    assert get_stats()["text_cache_misses"] == 2
+
+
+def test_eviction(text_cache):
+    """Test that the least recently used entries are removed first."""
+    for age, key in enumerate(("recent", "used", "old")):
+        textcache.store(key, ["Gauge field theory\n" * 100])
+        os.utime(str(text_cache.join(key + ".text")), (1000 - age, 1000 - age))
+    assert textcache.load("used") is not None
+
+    textcache.evict(text_cache.join("recent.text").size() * 2)
+    assert sorted(text_cache.listdir(), key=str) == [
+        text_cache.join("recent.text"),
+        text_cache.join("used.text"),
+    ]
+    assert get_stats()["text_cache_evictions"] == 1
+
+
+def test_eviction_of_temporary_files(text_cache):
+    """Test that the temporary files of writers which died are removed."""
+    textcache.store("entry", ["Gauge field theory\n" * 100])
+    entry_size = text_cache.join("entry.text").size()
+    for name in ("stale.tmp", "written.tmp"):
+        text_cache.join(name).write_binary(b"\0" * entry_size)
+    os.utime(str(text_cache.join("stale.tmp")), (1000, 1000))
+
+    # The temporary file being written counts in the size of the cache.
+    textcache.evict(entry_size * 2)
+    assert sorted(text_cache.listdir(), key=str) == [
+        text_cache.join("entry.text"),
+        text_cache.join("written.tmp"),
+    ]
+    assert get_stats()["text_cache_stale_files"] == 1
+    textcache.evict(entry_size)
+    assert text_cache.listdir() == [text_cache.join("written.tmp")]
+
+
+def test_eviction_scans(text_cache, monkeypatch):
+    """Test that the cache is only scanned when it may be over its size."""
+    scans = []
+    evict = textcache.evict
+    monkeypatch.setattr(textcache, "evict", lambda size: scans.append(evict(size)))
+    monkeypatch.setattr(textcache, "_SCAN_INTERVAL", 10)
+    entry_size = len(zlib.compress(marshal.dumps(["Gauge field theory\n" * 100])))
+    monkeypatch.setattr(textcache, "CLASSIFIER_TEXT_CACHE_SIZE", entry_size * 5.5)
+
+    for number in range(5):
+        textcache.store("entry%d" % number, ["Gauge field theory\n" * 100])
+    # Only the first store scans, to know the size of the cache.
+    assert len(scans) == 1
+    textcache.store("entry5", ["Gauge field theory\n" * 100])
+    assert len(scans) == 2
+    assert len(text_cache.listdir()) == 5
+
+    monkeypatch.setattr(textcache, "CLASSIFIER_TEXT_CACHE_SIZE", entry_size * 100)
+    for number in range(10):
+        textcache.store("other%d" % number, ["Yang-Mills\n"])
+    assert len(scans) == 3
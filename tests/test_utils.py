@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2026 CERN.
+#
+# Invenio is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# Invenio is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Invenio; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""Test suite for the classifier utils."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import threading
+
+import pytest
+
+from invenio_classifier.utils import prefetch
+
+
+def test_prefetch():
+    """Test that the next item is computed while an item is used."""
+    computed = []
+    next_computed = threading.Event()
+
+    def items():
+        for item in range(3):
+            computed.append(item)
+            if item == 1:
+                next_computed.set()
+            yield item
+
+    iterator = prefetch(items())
+    assert next(iterator) == 0
+    assert next_computed.wait(5)
+    assert list(iterator) == [1, 2]
+
+
+def test_prefetch_errors():
+    """Test that the errors of the iterable are raised by the iteration."""
+
+    def items():
+        yield 0
+        raise ValueError("not an item")
+
+    iterator = prefetch(items())
+    assert next(iterator) == 0
+    with pytest.raises(ValueError):
+        next(iterator)
+
+
+def test_prefetch_left():
+    """Test that leaving the iteration stops and closes the iterable."""
+    closed = []
+
+    def items():
+        try:
+            for item in range(100):
+                yield item
+        finally:
+            closed.append(True)
+
+    iterator = prefetch(items())
+    assert next(iterator) == 0
+    iterator.close()
+    assert closed == [True]